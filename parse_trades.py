@@ -1,10 +1,19 @@
 import csv
+import heapq
 import json
+import os
 import re
+import string
 from collections import defaultdict
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache, partial
+from html import escape
+from operator import attrgetter, itemgetter
 from pathlib import Path
+from sys import intern
 
 try:
     import pdfplumber
@@ -14,7 +23,34 @@ except ImportError:
     print("Warning: pdfplumber not installed. PDF parsing disabled. Install with: pip install pdfplumber")
 
 
-@dataclass
+# Precompiled patterns for ZERO CSV Verwendungszweck parsing.
+# Order, Sparplan and Bruchstücke share one alternation; the branch that
+# matched is identified by which ISIN group is set.
+_TRADE_RE = re.compile(
+    r"(?:Order Nr (?P<order_nr>\d+) ISIN (?P<o_isin>[A-Z0-9]{12})"
+    r"|Sparplan-Order zu ISIN (?P<s_isin>[A-Z0-9]{12})"
+    r"|Bruchstücke-Order zu ISIN (?P<b_isin>[A-Z0-9]{12}))"
+    r" - (?P<side>Kauf|Verkauf)\s+\((?P<name>.+?)\s+ISIN [A-Z0-9]{12}\s+STK\s+(?P<stk>[\d,.\s]+)"
+)
+_WP_RE = re.compile(r"WP-Abrechnung Verkauf:.*?ISIN ([A-Z0-9]{12})\s+STK\s+([\d,.\s]+)")
+_ISIN_CHARS = frozenset(string.ascii_uppercase + string.digits)
+
+# Verwendungszweck keyword -> transaction type for everything except orders.
+# The first keyword found wins, so the order matters.
+_ZWECK_TYPES = (
+    ("Gutschrift", "Einzahlung"),
+    ("Auszahlung", "Auszahlung"),
+    ("Lastschrift", "Lastschrift"),
+    ("Coupons/Dividende", "Dividende"),
+    ("Steuerausgleich", "Steuerausgleich"),
+    ("Vorabpauschale", "Vorabpauschale"),
+    ("WP-Abrechnung", "WP-Abrechnung"),
+    ("KKT-Abschluss", "KKT-Abschluss"),
+)
+_ZWECK_TYPES_WITH_ISIN = frozenset({"Dividende", "Vorabpauschale"})
+
+
+@dataclass(slots=True)
 class Transaction:
     datum: datetime
     valuta: datetime
@@ -26,41 +62,109 @@ class Transaction:
     # Parsed fields
     typ: str = ""
     order_nr: str = ""
-    isin: str = ""
+    isin: str = ""  # Interned, so per-ISIN dict lookups match by identity
     name: str = ""
     stueck: float = 0.0
     is_kauf: bool = False
     is_verkauf: bool = False
 
 
+@dataclass(slots=True)
+class Summary:
+    # Figures shared by the console output in main and the HTML report
+    sorted_trades: list[Transaction]  # Orders, Sparpläne, Bruchstücke, WP-Abrechnungen by date
+    steuerausgleich: list[Transaction]
+    dividenden: list[Transaction]
+    open_positions: list[dict]  # Sorted by invested amount
+    closed_positions: list[dict]  # Sorted by PnL
+    sale_events: list[tuple]  # (date, pnl, type, name) per sale, in date order
+    volume_by_month: dict  # year * 12 + month - 1 -> [kauf, verkauf, count]
+    volume_by_weekday: list  # 0=Monday .. 6=Sunday -> [kauf, verkauf, count]
+    kauf_count: int
+    verkauf_count: int
+    total_einzahlung: float
+    total_auszahlung: float
+    total_steuerausgleich: float
+    total_dividenden: float
+    total_volume: float
+    total_realized_pnl: float
+    total_invested_open: float
+
+
 def parse_german_number(value: str) -> float:
     """Parse German number format (1.234,56 -> 1234.56)"""
-    if not value or value.strip() == "":
+    if not value:
         return 0.0
+    value = value.strip()
+    if not value:
+        return 0.0
+    # Fast path for amounts with exactly two decimals (the common € case):
+    # int parsing plus one correctly rounded division yields the same float.
+    # Zero falls through so that "-0,00" keeps its sign.
+    if len(value) > 3 and value[-3] == "," and value[-2:].isdigit():
+        try:
+            cents = int(value[:-3].replace(".", "") + value[-2:])
+        except ValueError:
+            pass
+        else:
+            if cents:
+                return cents / 100
     # Remove thousand separators (.) and replace decimal comma with dot
-    cleaned = value.strip().replace(".", "").replace(",", ".")
+    cleaned = value.replace(".", "").replace(",", ".")
     try:
         return float(cleaned)
     except ValueError:
         return 0.0
 
 
-def format_german_number(value: float, decimals: int = 2) -> str:
-    """Format number to German format (1234.56 -> 1.234,56)"""
+def _format_german_number(value: float, decimals: int) -> str:
     formatted = f"{value:,.{decimals}f}"
     # Swap . and , for German format
     formatted = formatted.replace(",", "X").replace(".", ",").replace("X", ".")
     return formatted
 
 
+# Report tables repeat many identical values (zero, counts, recurring prices)
+_format_german_number_cached = lru_cache(maxsize=4096)(_format_german_number)
+
+
+def format_german_number(value: float, decimals: int = 2) -> str:
+    """Format number to German format (1234.56 -> 1.234,56)"""
+    # 0.0 and -0.0 share a cache key but format differently
+    if value == 0:
+        return _format_german_number(value, decimals)
+    return _format_german_number_cached(value, decimals)
+
+
 def parse_german_date(value: str) -> datetime:
     """Parse German date format (DD.MM.YYYY)"""
+    value = value.strip()
+    # Fast path for the fixed-width layout; anything else goes through strptime
+    if len(value) == 10 and value[2] == "." and value[5] == "." and value.isascii():
+        day, month, year = value[:2], value[3:5], value[6:]
+        if day.isdigit() and month.isdigit() and year.isdigit():
+            try:
+                return datetime(int(year), int(month), int(day))
+            except ValueError:
+                return datetime.min
     try:
-        return datetime.strptime(value.strip(), "%d.%m.%Y")
+        return datetime.strptime(value, "%d.%m.%Y")
     except ValueError:
         return datetime.min
 
 
+@lru_cache(maxsize=4096)
+def _day_key(value: datetime) -> str:
+    """Return the YYYY-MM-DD key for a date"""
+    return value.strftime("%Y-%m-%d")
+
+
+@lru_cache(maxsize=4096)
+def _display_date(value: datetime) -> str:
+    """Return the DD.MM.YYYY text shown for a date"""
+    return f"{value.day:02d}.{value.month:02d}.{value.year:04d}"
+
+
 # German month names for Trade Republic PDF parsing (including encoding variants)
 GERMAN_MONTHS = {
     "Januar": 1, "Jan": 1, "Jan.": 1,
@@ -78,6 +182,52 @@ GERMAN_MONTHS = {
 }
 
 
+# Precompiled patterns for Trade Republic PDF parsing
+_TR_DATE_RE = re.compile(r"(\d{1,2})\s+(\w+\.?)\s+(\d{4})")
+_TR_TRADE_RE = re.compile(r"(Buy|Sell)\s+trade\s+([A-Z0-9]{12})\s+(.+?),\s*quantity:\s*([\d.,]+)")
+_TR_DIVIDEND_RE = re.compile(r"Cash Dividend for ISIN\s+([A-Z0-9]{12})")
+# Lines that start a transaction, told apart by which group matched:
+# Format 1: "DD Monat" alone on a line (no direction)
+# Format 2: "DD Monat Buy/Sell trade ISIN NAME, quantity:" (quantity on next line; name)
+# Format 3: "DD Monat Buy/Sell trade ISIN PARTIAL_NAME" (name continues, no quantity yet; name_part)
+_TR_DATE_LINE_RE = re.compile(
+    r"^(?P<day>\d{1,2})\s+(?P<month>[\wäöü]+\.?)"
+    r"(?:\s+(?P<direction>Buy|Sell)\s+trade\s+(?P<isin>[A-Z0-9]{12})\s+"
+    r"(?:(?P<name>.+?),\s*quantity:\s*|(?P<name_part>.+)))?$",
+    re.IGNORECASE
+)
+_TR_AMOUNT_RE = re.compile(r"(-?[\d.]+,\d{2})\s*€")
+_TR_AMOUNT_STRIP_RE = re.compile(r"\s*-?[\d.]+,\d{2}\s*€")
+_TR_YEAR_QTY_RE = re.compile(r"^(\d{4})\s+([\d.]+)$")
+_TR_YEAR_REST_RE = re.compile(r"^(\d{4})\s+(.*)$")
+_TR_YEAR_LINE_RE = re.compile(r"^(\d{4})(?:\s+(.*))?$")
+_TR_YEAR_IN_TEXT_RE = re.compile(r"\b(20\d{2})\b")
+_TR_QUANTITY_RE = re.compile(r"quantity:\s*([\d.]+)")
+_TR_QUANTITY_STRIP_RE = re.compile(r",?\s*quantity:\s*[\d.]+")
+# Header, footer and section title lines, matched anywhere in the line
+# ("Bitte überprüfe" only at the start)
+_TR_SKIP_LINE_RE = re.compile("|".join(
+    [re.escape(marker) for marker in (
+        "TRADE REPUBLIC", "DATUM TYP", "Trade Republic Bank", "www.traderepublic",
+        "Erstellt am", "Seite", "KONTOÜBERSICHT", "UMSATZÜBERSICHT", "PRODUKT",
+        "Cashkonto", "BARMITTELÜBERSICHT", "TREUHANDKONTEN", "GELDMARKTFONDS",
+        "HINWEISE", "Einwendungen",
+    )] + ["^Bitte überprüfe"]
+))
+# Type can be directly attached: "ÜberweisungIncoming..." or "Handel Buy..."
+# Or separated: "Überweisung Incoming..."
+_TR_TYP_PATTERNS = (
+    # Überweisung patterns (with and without space)
+    (re.compile(r"^[Üü]berweisung\s*(.+)$", re.IGNORECASE), "Überweisung"),
+    # Handel patterns
+    (re.compile(r"^Handel\s+(.+)$", re.IGNORECASE), "Handel"),
+    # Steuern patterns
+    (re.compile(r"^Steuern\s+(.+)$", re.IGNORECASE), "Steuern"),
+    # Erträge patterns (with encoding variants)
+    (re.compile(r"^Ertr[äa]ge\s*(.+)$", re.IGNORECASE), "Erträge"),
+)
+
+
 def normalize_tr_text(text: str) -> str:
     """Normalize Trade Republic PDF text for consistent parsing"""
     # Handle common encoding issues with German umlauts
@@ -95,7 +245,7 @@ def parse_trade_republic_date(date_str: str) -> datetime:
     """Parse Trade Republic date format (e.g., '04 März 2025' or '02 Apr. 2025')"""
     date_str = date_str.strip()
     # Pattern: DD Month YYYY
-    match = re.match(r"(\d{1,2})\s+(\w+\.?)\s+(\d{4})", date_str)
+    match = _TR_DATE_RE.match(date_str)
     if match:
         day = int(match.group(1))
         month_str = match.group(2)
@@ -111,15 +261,12 @@ def parse_trade_republic_beschreibung(beschreibung: str, transaction: Transactio
     beschreibung = beschreibung.strip()
 
     # Buy/Sell trade pattern: "Buy trade ISIN NAME, quantity: X" or "Sell trade ISIN NAME, quantity: X"
-    trade_match = re.match(
-        r"(Buy|Sell)\s+trade\s+([A-Z0-9]{12})\s+(.+?),\s*quantity:\s*([\d.,]+)",
-        beschreibung
-    )
+    trade_match = _TR_TRADE_RE.match(beschreibung)
     if trade_match:
         transaction.typ = "Order"
         transaction.is_kauf = trade_match.group(1) == "Buy"
         transaction.is_verkauf = trade_match.group(1) == "Sell"
-        transaction.isin = trade_match.group(2)
+        transaction.isin = intern(trade_match.group(2))
         transaction.name = trade_match.group(3).strip()
         # Quantity uses dot as decimal separator in TR PDF
         quantity_str = trade_match.group(4).replace(",", "")
@@ -145,10 +292,10 @@ def parse_trade_republic_beschreibung(beschreibung: str, transaction: Transactio
         return
 
     # Cash Dividend
-    div_match = re.match(r"Cash Dividend for ISIN\s+([A-Z0-9]{12})", beschreibung)
+    div_match = _TR_DIVIDEND_RE.match(beschreibung)
     if div_match:
         transaction.typ = "Dividende"
-        transaction.isin = div_match.group(1)
+        transaction.isin = intern(div_match.group(1))
         return
 
     transaction.typ = "Sonstig"
@@ -162,80 +309,52 @@ def read_trade_republic_pdf(filepath: str) -> list[Transaction]:
     transactions = []
 
     with pdfplumber.open(filepath) as pdf:
-        all_text = ""
+        # Lines of all pages in one list; a transaction may continue on the next page
+        lines: list[str] = []
         for page in pdf.pages:
             text = page.extract_text()
             if text:
-                all_text += text + "\n"
+                lines.extend(text.split("\n"))
 
-        if not all_text:
+        if not lines:
             return transactions
 
-        lines = all_text.split("\n")
-
         # The PDF format has transactions split across multiple lines:
         # Line 1: "DD Monat"
         # Line 2: "Typ[no space]Description ... amount € amount €" OR "Typ Description..."
         # Line 3: "YYYY" OR "YYYY additional_description_part"
         # OR in some cases the year is on the same line as the type
 
+        # Per-line lookups bound once outside the loop
+        n_lines = len(lines)
+        is_skip_line = _TR_SKIP_LINE_RE.search
+        match_date_line = _TR_DATE_LINE_RE.match
+
         i = 0
-        while i < len(lines):
+        while i < n_lines:
             line = lines[i].strip()
 
             # Skip headers, footers, and empty lines
-            if not line or "TRADE REPUBLIC" in line or "DATUM TYP" in line:
+            if not line or is_skip_line(line):
                 i += 1
                 continue
-            if "Trade Republic Bank" in line or "www.traderepublic" in line:
-                i += 1
-                continue
-            if "Erstellt am" in line or "Seite" in line:
-                i += 1
-                continue
-            if "KONTOÜBERSICHT" in line or "UMSATZÜBERSICHT" in line:
-                i += 1
-                continue
-            if "PRODUKT" in line or "Cashkonto" in line:
-                i += 1
-                continue
-            if "BARMITTELÜBERSICHT" in line or "TREUHANDKONTEN" in line:
-                i += 1
-                continue
-            if "GELDMARKTFONDS" in line or "HINWEISE" in line:
-                i += 1
-                continue
-            if line.startswith("Bitte überprüfe") or "Einwendungen" in line:
+
+            date_match = match_date_line(normalize_tr_text(line))
+            if date_match is None:
                 i += 1
                 continue
 
-            # Format 1: "DD Monat" alone on a line
-            date_start_match = re.match(r"^(\d{1,2})\s+([\wäöü]+\.?)$", line, re.IGNORECASE)
-
-            # Format 2: "DD Monat Buy/Sell trade ISIN NAME, quantity:" (quantity on next line)
-            date_with_trade_match = re.match(
-                r"^(\d{1,2})\s+([\wäöü]+\.?)\s+(Buy|Sell)\s+trade\s+([A-Z0-9]{12})\s+(.+?),\s*quantity:\s*$",
-                normalize_tr_text(line),
-                re.IGNORECASE
-            )
-
-            # Format 3: "DD Monat Buy/Sell trade ISIN PARTIAL_NAME" (name continues, no quantity yet)
-            date_with_partial_trade_match = re.match(
-                r"^(\d{1,2})\s+([\wäöü]+\.?)\s+(Buy|Sell)\s+trade\s+([A-Z0-9]{12})\s+(.+)$",
-                normalize_tr_text(line),
-                re.IGNORECASE
-            )
+            day = date_match.group("day")
+            month_str = date_match.group("month")
 
-            if date_with_trade_match:
+            if date_match.group("name") is not None:
                 # Format 2: Date with partial trade info
-                day = date_with_trade_match.group(1)
-                month_str = date_with_trade_match.group(2)
-                trade_direction = date_with_trade_match.group(3)
-                isin = date_with_trade_match.group(4)
-                name = date_with_trade_match.group(5).strip()
+                trade_direction = date_match.group("direction")
+                isin = intern(date_match.group("isin"))
+                name = date_match.group("name").strip()
 
                 # Next lines contain: "Handel [amounts]" and "YYYY [quantity]"
-                if i + 2 >= len(lines):
+                if i + 2 >= n_lines:
                     i += 1
                     continue
 
@@ -245,11 +364,10 @@ def read_trade_republic_pdf(filepath: str) -> list[Transaction]:
                 year_qty_line = normalize_tr_text(lines[i].strip())
 
                 # Extract amounts from amounts_line
-                amount_pattern = r"(-?[\d.]+,\d{2})\s*€"
-                amounts = re.findall(amount_pattern, amounts_line)
+                amounts = _TR_AMOUNT_RE.findall(amounts_line)
 
                 # Extract year and quantity from year_qty_line
-                year_qty_match = re.match(r"^(\d{4})\s+([\d.]+)$", year_qty_line)
+                year_qty_match = _TR_YEAR_QTY_RE.match(year_qty_line)
                 if not year_qty_match:
                     continue
 
@@ -298,18 +416,16 @@ def read_trade_republic_pdf(filepath: str) -> list[Transaction]:
                 i += 1
                 continue
 
-            elif date_with_partial_trade_match and not date_with_trade_match:
+            elif date_match.group("name_part") is not None:
                 # Format 3: Long names split across lines
                 # Line 1: "DD Monat Buy/Sell trade ISIN PARTIAL_NAME"
                 # Line 2: "Handel [amounts]"
                 # Line 3: "YYYY REST_NAME, quantity: X"
-                day = date_with_partial_trade_match.group(1)
-                month_str = date_with_partial_trade_match.group(2)
-                trade_direction = date_with_partial_trade_match.group(3)
-                isin = date_with_partial_trade_match.group(4)
-                name_part1 = date_with_partial_trade_match.group(5).strip()
+                trade_direction = date_match.group("direction")
+                isin = intern(date_match.group("isin"))
+                name_part1 = date_match.group("name_part").strip()
 
-                if i + 2 >= len(lines):
+                if i + 2 >= n_lines:
                     i += 1
                     continue
 
@@ -319,11 +435,10 @@ def read_trade_republic_pdf(filepath: str) -> list[Transaction]:
                 year_rest_line = normalize_tr_text(lines[i].strip())
 
                 # Extract amounts
-                amount_pattern = r"(-?[\d.]+,\d{2})\s*€"
-                amounts = re.findall(amount_pattern, amounts_line)
+                amounts = _TR_AMOUNT_RE.findall(amounts_line)
 
                 # Parse year line: "YYYY REST_NAME, quantity: X" or "YYYY quantity: X"
-                year_rest_match = re.match(r"^(\d{4})\s+(.*)$", year_rest_line)
+                year_rest_match = _TR_YEAR_REST_RE.match(year_rest_line)
                 if not year_rest_match:
                     continue
 
@@ -331,14 +446,14 @@ def read_trade_republic_pdf(filepath: str) -> list[Transaction]:
                 rest_content = year_rest_match.group(2)
 
                 # Extract quantity from rest
-                qty_match = re.search(r"quantity:\s*([\d.]+)", rest_content)
+                qty_match = _TR_QUANTITY_RE.search(rest_content)
                 if qty_match:
                     try:
                         quantity = float(qty_match.group(1))
                     except ValueError:
                         quantity = 0.0
                     # Name continuation is before "quantity:"
-                    name_part2 = re.sub(r",?\s*quantity:\s*[\d.]+", "", rest_content).strip()
+                    name_part2 = _TR_QUANTITY_STRIP_RE.sub("", rest_content).strip()
                 else:
                     quantity = 0.0
                     name_part2 = rest_content.strip()
@@ -385,40 +500,25 @@ def read_trade_republic_pdf(filepath: str) -> list[Transaction]:
                 i += 1
                 continue
 
-            elif date_start_match:
-                day = date_start_match.group(1)
-                month_str = date_start_match.group(2)
-
+            else:
+                # Format 1: date alone on the line
                 # Next line should have type and description, year comes later or on same line
-                if i + 1 >= len(lines):
+                if i + 1 >= n_lines:
                     i += 1
                     continue
 
                 # Collect the transaction data from following lines
                 i += 1
-                data_line = lines[i].strip() if i < len(lines) else ""
+                data_line = lines[i].strip() if i < n_lines else ""
 
                 # Normalize text to handle encoding issues
                 data_line = normalize_tr_text(data_line)
 
-                # Type can be directly attached: "ÜberweisungIncoming..." or "Handel Buy..."
-                # Or separated: "Überweisung Incoming..."
-                typ_patterns = [
-                    # Überweisung patterns (with and without space)
-                    (r"^[Üü]berweisung\s*(.+)$", "Überweisung"),
-                    # Handel patterns
-                    (r"^Handel\s+(.+)$", "Handel"),
-                    # Steuern patterns
-                    (r"^Steuern\s+(.+)$", "Steuern"),
-                    # Erträge patterns (with encoding variants)
-                    (r"^Ertr[äa]ge\s*(.+)$", "Erträge"),
-                ]
-
                 tr_typ = None
                 rest_data = ""
 
-                for pattern, typ_name in typ_patterns:
-                    match = re.match(pattern, data_line, re.IGNORECASE)
+                for pattern, typ_name in _TR_TYP_PATTERNS:
+                    match = pattern.match(data_line)
                     if match:
                         tr_typ = typ_name
                         rest_data = match.group(1)
@@ -429,9 +529,9 @@ def read_trade_republic_pdf(filepath: str) -> list[Transaction]:
 
                 # Look for year in next line
                 year = None
-                if i + 1 < len(lines):
+                if i + 1 < n_lines:
                     year_line = lines[i + 1].strip()
-                    year_match = re.match(r"^(\d{4})(?:\s+(.*))?$", year_line)
+                    year_match = _TR_YEAR_LINE_RE.match(year_line)
                     if year_match:
                         year = int(year_match.group(1))
                         # Additional description might be on the year line
@@ -442,7 +542,7 @@ def read_trade_republic_pdf(filepath: str) -> list[Transaction]:
 
                 if not year:
                     # Try to find year in the data line itself
-                    year_in_data = re.search(r"\b(20\d{2})\b", data_line)
+                    year_in_data = _TR_YEAR_IN_TEXT_RE.search(data_line)
                     if year_in_data:
                         year = int(year_in_data.group(1))
                     else:
@@ -463,11 +563,10 @@ def read_trade_republic_pdf(filepath: str) -> list[Transaction]:
 
                 # Extract amounts from rest_data
                 # Format: "description amount € [amount €] saldo €"
-                amount_pattern = r"(-?[\d.]+,\d{2})\s*€"
-                amounts = re.findall(amount_pattern, rest_data)
+                amounts = _TR_AMOUNT_RE.findall(rest_data)
 
                 # Remove amounts to get description
-                beschreibung = re.sub(r"\s*-?[\d.]+,\d{2}\s*€", "", rest_data).strip()
+                beschreibung = _TR_AMOUNT_STRIP_RE.sub("", rest_data).strip()
 
                 # Determine betrag based on type and amounts
                 betrag = 0.0
@@ -507,100 +606,72 @@ def read_trade_republic_pdf(filepath: str) -> list[Transaction]:
     return transactions
 
 
-def parse_verwendungszweck(zweck: str, transaction: Transaction):
-    """Extract trade details from Verwendungszweck"""
-
-    # Order pattern: Order Nr XXXXXX ISIN XXXXXXXXXXXX - Kauf/Verkauf (NAME ISIN XXX STK XX)
-    order_match = re.search(r"Order Nr (\d+) ISIN ([A-Z0-9]{12}) - (Kauf|Verkauf)\s+\((.+?)\s+ISIN [A-Z0-9]{12}\s+STK\s+([\d,.\s]+)", zweck)
-    if order_match:
-        transaction.typ = "Order"
-        transaction.order_nr = order_match.group(1)
-        transaction.isin = order_match.group(2)
-        transaction.is_kauf = order_match.group(3) == "Kauf"
-        transaction.is_verkauf = order_match.group(3) == "Verkauf"
-        transaction.name = order_match.group(4).strip()
-        stueck_str = order_match.group(5).strip().replace(" ", "").replace("-", "")
-        transaction.stueck = parse_german_number(stueck_str)
-        return
-
-    # Sparplan pattern
-    sparplan_match = re.search(r"Sparplan-Order zu ISIN ([A-Z0-9]{12}) - (Kauf|Verkauf)\s+\((.+?)\s+ISIN [A-Z0-9]{12}\s+STK\s+([\d,.\s]+)", zweck)
-    if sparplan_match:
-        transaction.typ = "Sparplan"
-        transaction.isin = sparplan_match.group(1)
-        transaction.is_kauf = sparplan_match.group(2) == "Kauf"
-        transaction.is_verkauf = sparplan_match.group(2) == "Verkauf"
-        transaction.name = sparplan_match.group(3).strip()
-        stueck_str = sparplan_match.group(4).strip().replace(" ", "").replace("-", "")
-        transaction.stueck = parse_german_number(stueck_str)
-        return
-
-    # Bruchstücke pattern
-    bruch_match = re.search(r"Bruchstücke-Order zu ISIN ([A-Z0-9]{12}) - (Kauf|Verkauf)\s+\((.+?)\s+ISIN [A-Z0-9]{12}\s+STK\s+([\d,.\s]+)", zweck)
-    if bruch_match:
-        transaction.typ = "Bruchstücke"
-        transaction.isin = bruch_match.group(1)
-        transaction.is_kauf = bruch_match.group(2) == "Kauf"
-        transaction.is_verkauf = bruch_match.group(2) == "Verkauf"
-        transaction.name = bruch_match.group(3).strip()
-        stueck_str = bruch_match.group(4).strip().replace(" ", "").replace("-", "")
-        transaction.stueck = parse_german_number(stueck_str)
-        return
-
-    # Gutschrift
-    if "Gutschrift" in zweck:
-        transaction.typ = "Einzahlung"
-        return
-
-    # Auszahlung
-    if "Auszahlung" in zweck:
-        transaction.typ = "Auszahlung"
-        return
-
-    # Lastschrift
-    if "Lastschrift" in zweck:
-        transaction.typ = "Lastschrift"
-        return
-
-    # Dividende
-    if "Coupons/Dividende" in zweck:
-        transaction.typ = "Dividende"
-        div_match = re.search(r"ISIN ([A-Z0-9]{12})", zweck)
-        if div_match:
-            transaction.isin = div_match.group(1)
-        return
-
-    # Steuerausgleich
-    if "Steuerausgleich" in zweck:
-        transaction.typ = "Steuerausgleich"
-        return
-
-    # Vorabpauschale
-    if "Vorabpauschale" in zweck:
-        transaction.typ = "Vorabpauschale"
-        vp_match = re.search(r"ISIN ([A-Z0-9]{12})", zweck)
-        if vp_match:
-            transaction.isin = vp_match.group(1)
-        return
+def find_isin(text: str) -> str:
+    """Return the first 12-character code following "ISIN " (empty if none)"""
+    # Plain substring scan; equivalent to searching for r"ISIN ([A-Z0-9]{12})"
+    idx = text.find("ISIN ")
+    while idx != -1:
+        code = text[idx + 5:idx + 17]
+        if len(code) == 12 and _ISIN_CHARS.issuperset(code):
+            return intern(code)
+        idx = text.find("ISIN ", idx + 1)
+    return ""
+
+
+@lru_cache(maxsize=8192)
+def _classify_verwendungszweck(zweck: str) -> tuple[str, str, str, str, float, bool, bool]:
+    """Return (typ, order_nr, isin, name, stueck, is_kauf, is_verkauf) for a Verwendungszweck"""
+
+    # Order / Sparplan / Bruchstücke pattern:
+    # Order Nr XXXXXX ISIN XXXXXXXXXXXX - Kauf/Verkauf (NAME ISIN XXX STK XX)
+    # Sparplan-Order zu ISIN XXXXXXXXXXXX - Kauf/Verkauf (NAME ISIN XXX STK XX)
+    # Bruchstücke-Order zu ISIN XXXXXXXXXXXX - Kauf/Verkauf (NAME ISIN XXX STK XX)
+    # The cheap substring probe keeps non-order rows away from the regex
+    if "Order" in zweck:
+        trade_match = _TRADE_RE.search(zweck)
+        if trade_match:
+            order_nr = ""
+            if trade_match.group("o_isin"):
+                typ = "Order"
+                order_nr = trade_match.group("order_nr")
+                isin = trade_match.group("o_isin")
+            elif trade_match.group("s_isin"):
+                typ = "Sparplan"
+                isin = trade_match.group("s_isin")
+            else:
+                typ = "Bruchstücke"
+                isin = trade_match.group("b_isin")
+            side = trade_match.group("side")
+            stueck_str = trade_match.group("stk").strip().replace(" ", "").replace("-", "")
+            return (typ, order_nr, intern(isin), trade_match.group("name").strip(),
+                    parse_german_number(stueck_str), side == "Kauf", side == "Verkauf")
+
+    # Remaining types are recognised by keyword, checked in table order
+    for keyword, typ in _ZWECK_TYPES:
+        if keyword in zweck:
+            break
+    else:
+        return ("Sonstig", "", "", "", 0.0, False, False)
 
     # WP-Abrechnung (Knock-out etc.) - treat as sale
-    if "WP-Abrechnung" in zweck:
-        transaction.typ = "WP-Abrechnung"
+    if typ == "WP-Abrechnung":
         # Pattern: WP-Abrechnung Verkauf: NAME ISIN XXXXXXXXXXXX STK XX - REFERENZ
-        wp_match = re.search(r"WP-Abrechnung Verkauf:.*?ISIN ([A-Z0-9]{12})\s+STK\s+([\d,.\s]+)", zweck)
+        wp_match = _WP_RE.search(zweck)
         if wp_match:
-            transaction.isin = wp_match.group(1)
             stueck_str = wp_match.group(2).strip().replace(" ", "").replace("-", "")
-            transaction.stueck = parse_german_number(stueck_str)
-            transaction.is_verkauf = True
-        return
+            return ("WP-Abrechnung", "", intern(wp_match.group(1)), "",
+                    parse_german_number(stueck_str), False, True)
 
-    # KKT-Abschluss
-    if "KKT-Abschluss" in zweck:
-        transaction.typ = "KKT-Abschluss"
-        return
+    # Dividends and Vorabpauschale name the security
+    isin = find_isin(zweck) if typ in _ZWECK_TYPES_WITH_ISIN else ""
+    return (typ, "", isin, "", 0.0, False, False)
 
-    transaction.typ = "Sonstig"
+
+def parse_verwendungszweck(zweck: str, transaction: Transaction):
+    """Extract trade details from Verwendungszweck"""
+    # Recurring texts (fees, Sparplan runs, repeated dividends) are classified once
+    (transaction.typ, transaction.order_nr, transaction.isin, transaction.name,
+     transaction.stueck, transaction.is_kauf, transaction.is_verkauf) = _classify_verwendungszweck(zweck)
 
 
 def read_csv(filepath: str) -> list[Transaction]:
@@ -608,16 +679,47 @@ def read_csv(filepath: str) -> list[Transaction]:
     transactions = []
 
     with open(filepath, "r", encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f, delimiter=";")
+        reader = csv.reader(f, delimiter=";")
+        header = next(reader, None)
+        if header is None:
+            return transactions
+
+        # Resolve column positions once; columns missing from the header
+        # point past the end of the row and read as empty strings
+        columns = {name: i for i, name in enumerate(header)}
+        missing = len(header)
+        datum_i, valuta_i, betrag_i, status_i, zweck_i, iban_i = (
+            columns.get(name, missing)
+            for name in ("Datum", "Valuta", "Betrag", "Status", "Verwendungszweck", "IBAN")
+        )
+        width = max(datum_i, valuta_i, betrag_i, status_i, zweck_i, iban_i) + 1
+
+        # Datum and Valuta repeat heavily across rows, so each distinct date
+        # string is parsed only once per file
+        dates: dict[str, datetime] = {}
 
         for row in reader:
+            if not row:
+                continue
+            if len(row) < width:
+                row += [""] * (width - len(row))
+
+            datum_str = row[datum_i]
+            datum = dates.get(datum_str)
+            if datum is None:
+                datum = dates[datum_str] = parse_german_date(datum_str)
+            valuta_str = row[valuta_i]
+            valuta = dates.get(valuta_str)
+            if valuta is None:
+                valuta = dates[valuta_str] = parse_german_date(valuta_str)
+
             t = Transaction(
-                datum=parse_german_date(row.get("Datum", "")),
-                valuta=parse_german_date(row.get("Valuta", "")),
-                betrag=parse_german_number(row.get("Betrag", "")),
-                status=row.get("Status", ""),
-                verwendungszweck=row.get("Verwendungszweck", ""),
-                iban=row.get("IBAN", "")
+                datum=datum,
+                valuta=valuta,
+                betrag=parse_german_number(row[betrag_i]),
+                status=row[status_i],
+                verwendungszweck=row[zweck_i],
+                iban=row[iban_i]
             )
             parse_verwendungszweck(t.verwendungszweck, t)
             transactions.append(t)
@@ -625,182 +727,43 @@ def read_csv(filepath: str) -> list[Transaction]:
     return transactions
 
 
-def generate_html(transactions: list[Transaction], output_path: str):
-    """Generate HTML overview of trades"""
-
-    # Calculate statistics - include Orders, Sparpläne, Bruchstücke, and WP-Abrechnungen
-    trade_types = ["Order", "Sparplan", "Bruchstücke", "WP-Abrechnung"]
-    trades = [t for t in transactions if t.typ in trade_types]
-    einzahlungen = [t for t in transactions if t.typ == "Einzahlung"]
-    auszahlungen = [t for t in transactions if t.typ == "Auszahlung"]
-    steuerausgleich = [t for t in transactions if t.typ == "Steuerausgleich"]
-    dividenden = [t for t in transactions if t.typ == "Dividende"]
-
-    total_steuerausgleich = sum(t.betrag for t in steuerausgleich)
-    total_dividenden = sum(t.betrag for t in dividenden)
-
-    kaufe = [t for t in trades if t.is_kauf]
-    verkaeufe = [t for t in trades if t.is_verkauf]
-
-    total_kauf = sum(t.betrag for t in kaufe)
-    total_verkauf = sum(t.betrag for t in verkaeufe)
-
-    total_einzahlung = sum(t.betrag for t in einzahlungen)
-    total_auszahlung = sum(t.betrag for t in auszahlungen)
-
-    # Calculate trade volume statistics
-    total_volume = sum(abs(t.betrag) for t in trades)
-    total_trades_count = len(trades)
-
-    # Volume per month
-    volume_by_month = defaultdict(lambda: {"kauf": 0.0, "verkauf": 0.0, "count": 0})
-    for t in trades:
-        month_key = t.datum.strftime("%Y-%m")
-        if t.is_kauf:
-            volume_by_month[month_key]["kauf"] += abs(t.betrag)
-        else:
-            volume_by_month[month_key]["verkauf"] += abs(t.betrag)
-        volume_by_month[month_key]["count"] += 1
-
-    # P&L per month (will be calculated after pnl_events are generated)
-    pnl_by_month = defaultdict(float)
-
-    # Volume per weekday (0=Monday, 6=Sunday)
-    volume_by_weekday = defaultdict(lambda: {"kauf": 0.0, "verkauf": 0.0, "count": 0})
-    weekday_names = ["Mo", "Di", "Mi", "Do", "Fr", "Sa", "So"]
-    for t in trades:
-        weekday = t.datum.weekday()
-        if t.is_kauf:
-            volume_by_weekday[weekday]["kauf"] += abs(t.betrag)
-        else:
-            volume_by_weekday[weekday]["verkauf"] += abs(t.betrag)
-        volume_by_weekday[weekday]["count"] += 1
-
-    # Group trades by ISIN with quantity tracking (Orders + Sparpläne + Bruchstücke)
-    trades_by_isin = {}
-    for t in trades:
-        if not t.isin:  # Skip transactions without ISIN
-            continue
-        if t.isin not in trades_by_isin:
-            trades_by_isin[t.isin] = {"name": t.name, "kaufe": [], "verkaeufe": []}
-        if t.is_kauf:
-            trades_by_isin[t.isin]["kaufe"].append(t)
-        else:
-            trades_by_isin[t.isin]["verkaeufe"].append(t)
-
-    # Calculate PnL per ISIN - separate open and closed positions
-    closed_positions = []
-    open_positions = []
-
-    for isin, data in trades_by_isin.items():
-        kauf_sum = sum(t.betrag for t in data["kaufe"])
-        verkauf_sum = sum(t.betrag for t in data["verkaeufe"])
-        kauf_stueck = sum(t.stueck for t in data["kaufe"])
-        verkauf_stueck = sum(t.stueck for t in data["verkaeufe"])
+# Compact JSON for the embedded chart data: no padding after separators and
+# no \uXXXX escaping of umlauts (the report is written as UTF-8)
+_json_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
 
-        # Calculate remaining/open quantity
-        open_stueck = kauf_stueck - verkauf_stueck
 
-        position_data = {
-            "isin": isin,
-            "name": data["name"],
-            "kauf_count": len(data["kaufe"]),
-            "verkauf_count": len(data["verkaeufe"]),
-            "kauf_sum": kauf_sum,
-            "verkauf_sum": verkauf_sum,
-            "kauf_stueck": kauf_stueck,
-            "verkauf_stueck": verkauf_stueck,
-            "open_stueck": open_stueck,
-        }
+def _json_encode(value) -> str:
+    """Encode value as compact JSON that is safe inside a <script> element"""
+    # A name containing "</script>" must not end the script block
+    return _json_encoder.encode(value).replace("</", "<\\/")
 
-        if abs(open_stueck) < 0.001:  # Fully closed position
-            position_data["pnl"] = verkauf_sum + kauf_sum
-            # Calculate hold time (first buy to last sell)
-            if data["kaufe"] and data["verkaeufe"]:
-                first_buy = min(t.datum for t in data["kaufe"])
-                last_sell = max(t.datum for t in data["verkaeufe"])
-                position_data["hold_days"] = (last_sell - first_buy).days
-                position_data["first_buy"] = first_buy
-                position_data["last_sell"] = last_sell
-            else:
-                position_data["hold_days"] = 0
-            # Calculate return %
-            invested = abs(kauf_sum)
-            position_data["rendite_pct"] = (position_data["pnl"] / invested * 100) if invested > 0 else 0
-            closed_positions.append(position_data)
-        else:
-            # Open position - calculate average buy price for held shares
-            if kauf_stueck > 0:
-                avg_kauf_preis = abs(kauf_sum) / kauf_stueck
-                position_data["avg_kauf_preis"] = avg_kauf_preis
-                position_data["invested"] = open_stueck * avg_kauf_preis
-            else:
-                position_data["avg_kauf_preis"] = 0
-                position_data["invested"] = 0
 
-            # If there were partial sales, calculate realized PnL
-            if verkauf_stueck > 0:
-                # Proportional cost basis for sold shares
-                cost_of_sold = (verkauf_stueck / kauf_stueck) * abs(kauf_sum) if kauf_stueck > 0 else 0
-                position_data["realized_pnl"] = verkauf_sum - cost_of_sold
-            else:
-                position_data["realized_pnl"] = 0
-
-            open_positions.append(position_data)
-
-    # Sort closed by PnL, open by invested amount
-    closed_positions.sort(key=lambda x: x["pnl"], reverse=True)
-    open_positions.sort(key=lambda x: x.get("invested", 0), reverse=True)
-
-    # Calculate totals using average cost basis (same method as P&L chart)
-    cost_basis_calc = {}
-    sorted_trades = sorted(trades, key=lambda t: t.datum)
-    total_trade_pnl = 0.0
-
-    for t in sorted_trades:
-        if not t.isin:
-            continue
-        if t.isin not in cost_basis_calc:
-            cost_basis_calc[t.isin] = {"cost": 0.0, "stueck": 0.0}
-        basis = cost_basis_calc[t.isin]
-
-        if t.is_kauf:
-            basis["cost"] += abs(t.betrag)
-            basis["stueck"] += t.stueck
-        elif t.is_verkauf and t.stueck > 0 and basis["stueck"] > 0:
-            avg_cost = basis["cost"] / basis["stueck"]
-            cost_of_sold = avg_cost * t.stueck
-            total_trade_pnl += t.betrag - cost_of_sold
-            basis["cost"] -= cost_of_sold
-            basis["stueck"] -= t.stueck
-
-    total_realized_pnl = total_trade_pnl + total_steuerausgleich + total_dividenden
-    total_invested_open = sum(p.get("invested", 0) for p in open_positions)
-
-    html = f"""<!DOCTYPE html>
+# Static HTML fragments for generate_html. Only _HTML_STATS and _HTML_CHART_DATA
+# carry placeholders; they are filled with str.format_map.
+_HTML_HEAD = """<!DOCTYPE html>
 <html lang="de">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Trade Übersicht</title>
     <style>
-        * {{
+        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
-        body {{
+        }
+        body {
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, sans-serif;
             background: linear-gradient(135deg, #1a1a2e 0%, #16213e 100%);
             min-height: 100vh;
             color: #e0e0e0;
             padding: 20px;
-        }}
-        .container {{
+        }
+        .container {
             max-width: 1400px;
             margin: 0 auto;
-        }}
-        h1 {{
+        }
+        h1 {
             text-align: center;
             font-size: 2.5rem;
             margin-bottom: 30px;
@@ -808,180 +771,180 @@ def generate_html(transactions: list[Transaction], output_path: str):
             -webkit-background-clip: text;
             -webkit-text-fill-color: transparent;
             background-clip: text;
-        }}
+        }
 
         /* Stats Cards */
-        .stats-grid {{
+        .stats-grid {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(220px, 1fr));
             gap: 20px;
             margin-bottom: 40px;
-        }}
-        .stat-card {{
+        }
+        .stat-card {
             background: rgba(255,255,255,0.05);
             border-radius: 16px;
             padding: 24px;
             backdrop-filter: blur(10px);
             border: 1px solid rgba(255,255,255,0.1);
             transition: transform 0.3s, box-shadow 0.3s;
-        }}
-        .stat-card:hover {{
+        }
+        .stat-card:hover {
             transform: translateY(-5px);
             box-shadow: 0 10px 40px rgba(0,0,0,0.3);
-        }}
-        .stat-label {{
+        }
+        .stat-label {
             font-size: 0.85rem;
             color: #888;
             text-transform: uppercase;
             letter-spacing: 1px;
             margin-bottom: 8px;
-        }}
-        .stat-value {{
+        }
+        .stat-value {
             font-size: 1.8rem;
             font-weight: 700;
-        }}
-        .stat-value.positive {{ color: #10b981; }}
-        .stat-value.negative {{ color: #ef4444; }}
-        .stat-value.neutral {{ color: #00d4ff; }}
+        }
+        .stat-value.positive { color: #10b981; }
+        .stat-value.negative { color: #ef4444; }
+        .stat-value.neutral { color: #00d4ff; }
 
         /* Section */
-        .section {{
+        .section {
             background: rgba(255,255,255,0.03);
             border-radius: 20px;
             padding: 30px;
             margin-bottom: 30px;
             border: 1px solid rgba(255,255,255,0.08);
-        }}
-        .section h2 {{
+        }
+        .section h2 {
             font-size: 1.5rem;
             margin-bottom: 20px;
             color: #fff;
             display: flex;
             align-items: center;
             gap: 10px;
-        }}
+        }
 
         /* Table */
-        table {{
+        table {
             width: 100%;
             border-collapse: collapse;
-        }}
-        th, td {{
+        }
+        th, td {
             padding: 14px 16px;
             text-align: left;
-        }}
-        th {{
+        }
+        th {
             background: rgba(255,255,255,0.05);
             font-weight: 600;
             font-size: 0.85rem;
             text-transform: uppercase;
             letter-spacing: 0.5px;
             color: #888;
-        }}
-        th:first-child {{ border-radius: 10px 0 0 10px; }}
-        th:last-child {{ border-radius: 0 10px 10px 0; }}
-        tr:hover td {{
+        }
+        th:first-child { border-radius: 10px 0 0 10px; }
+        th:last-child { border-radius: 0 10px 10px 0; }
+        tr:hover td {
             background: rgba(255,255,255,0.03);
-        }}
-        td {{
+        }
+        td {
             border-bottom: 1px solid rgba(255,255,255,0.05);
-        }}
-        .text-right {{ text-align: right; }}
-        .mono {{ font-family: 'SF Mono', Monaco, monospace; font-size: 0.9rem; }}
-        .positive {{ color: #10b981; }}
-        .negative {{ color: #ef4444; }}
+        }
+        .text-right { text-align: right; }
+        .mono { font-family: 'SF Mono', Monaco, monospace; font-size: 0.9rem; }
+        .positive { color: #10b981; }
+        .negative { color: #ef4444; }
 
-        .badge {{
+        .badge {
             display: inline-block;
             padding: 4px 10px;
             border-radius: 20px;
             font-size: 0.75rem;
             font-weight: 600;
-        }}
-        .badge-kauf {{
+        }
+        .badge-kauf {
             background: rgba(239, 68, 68, 0.2);
             color: #ef4444;
-        }}
-        .badge-verkauf {{
+        }
+        .badge-verkauf {
             background: rgba(16, 185, 129, 0.2);
             color: #10b981;
-        }}
+        }
 
-        .isin {{
+        .isin {
             font-family: monospace;
             font-size: 0.8rem;
             color: #666;
-        }}
-        .name {{
+        }
+        .name {
             font-weight: 500;
             max-width: 300px;
             overflow: hidden;
             text-overflow: ellipsis;
             white-space: nowrap;
-        }}
+        }
 
         /* All trades table */
-        .trades-table {{
+        .trades-table {
             max-height: 600px;
             overflow-y: auto;
-        }}
-        .trades-table::-webkit-scrollbar {{
+        }
+        .trades-table::-webkit-scrollbar {
             width: 8px;
-        }}
-        .trades-table::-webkit-scrollbar-track {{
+        }
+        .trades-table::-webkit-scrollbar-track {
             background: rgba(255,255,255,0.05);
             border-radius: 4px;
-        }}
-        .trades-table::-webkit-scrollbar-thumb {{
+        }
+        .trades-table::-webkit-scrollbar-thumb {
             background: rgba(255,255,255,0.2);
             border-radius: 4px;
-        }}
+        }
 
         /* Sortable table headers */
-        th.sortable {{
+        th.sortable {
             cursor: pointer;
             user-select: none;
             position: relative;
             padding-right: 24px;
             transition: background 0.2s;
-        }}
-        th.sortable:hover {{
+        }
+        th.sortable:hover {
             background: rgba(255,255,255,0.1);
-        }}
-        th.sortable::after {{
+        }
+        th.sortable::after {
             content: '⇅';
             position: absolute;
             right: 8px;
             opacity: 0.4;
             font-size: 0.75rem;
-        }}
-        th.sortable.asc::after {{
+        }
+        th.sortable.asc::after {
             content: '↑';
             opacity: 1;
             color: #00d4ff;
-        }}
-        th.sortable.desc::after {{
+        }
+        th.sortable.desc::after {
             content: '↓';
             opacity: 1;
             color: #00d4ff;
-        }}
+        }
 
         /* Chart container */
-        .chart-container {{
+        .chart-container {
             position: relative;
             height: 400px;
             margin-top: 20px;
-        }}
-        .chart-grid {{
+        }
+        .chart-grid {
             display: grid;
             grid-template-columns: 1fr 1fr;
             gap: 30px;
-        }}
-        @media (max-width: 1000px) {{
-            .chart-grid {{
+        }
+        @media (max-width: 1000px) {
+            .chart-grid {
                 grid-template-columns: 1fr;
-            }}
-        }}
+            }
+        }
     </style>
     <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
 </head>
@@ -989,34 +952,36 @@ def generate_html(transactions: list[Transaction], output_path: str):
     <div class="container">
         <h1>📈 Trade Übersicht</h1>
 
-        <div class="stats-grid">
+"""
+
+_HTML_STATS = """        <div class="stats-grid">
             <div class="stat-card">
                 <div class="stat-label">Einzahlungen</div>
-                <div class="stat-value positive">{format_german_number(total_einzahlung)} €</div>
+                <div class="stat-value positive">{total_einzahlung} €</div>
             </div>
             <div class="stat-card">
                 <div class="stat-label">Auszahlungen</div>
-                <div class="stat-value negative">{format_german_number(total_auszahlung)} €</div>
+                <div class="stat-value negative">{total_auszahlung} €</div>
             </div>
             <div class="stat-card">
                 <div class="stat-label">Realisierte P&L</div>
-                <div class="stat-value {'positive' if total_realized_pnl >= 0 else 'negative'}">{'+' if total_realized_pnl >= 0 else ''}{format_german_number(total_realized_pnl)} €</div>
+                <div class="stat-value {realized_pnl_class}">{realized_pnl_sign}{total_realized_pnl} €</div>
             </div>
             <div class="stat-card">
                 <div class="stat-label">Investiert (offen)</div>
-                <div class="stat-value neutral">{format_german_number(total_invested_open)} €</div>
+                <div class="stat-value neutral">{total_invested_open} €</div>
             </div>
             <div class="stat-card">
                 <div class="stat-label">Steuerausgleich</div>
-                <div class="stat-value positive">+{format_german_number(total_steuerausgleich)} €</div>
+                <div class="stat-value positive">+{total_steuerausgleich} €</div>
             </div>
             <div class="stat-card">
                 <div class="stat-label">Dividenden</div>
-                <div class="stat-value positive">+{format_german_number(total_dividenden)} €</div>
+                <div class="stat-value positive">+{total_dividenden} €</div>
             </div>
             <div class="stat-card">
                 <div class="stat-label">Trade Volume (gesamt)</div>
-                <div class="stat-value neutral">{format_german_number(total_volume)} €</div>
+                <div class="stat-value neutral">{total_volume} €</div>
             </div>
             <div class="stat-card">
                 <div class="stat-label">Anzahl Trades</div>
@@ -1024,7 +989,9 @@ def generate_html(transactions: list[Transaction], output_path: str):
             </div>
         </div>
 
-        <div class="section">
+"""
+
+_HTML_OPEN_POSITIONS = """        <div class="section">
             <h2>📊 Trade Volume</h2>
             <div style="margin-bottom: 15px;">
                 <label style="display: inline-flex; align-items: center; cursor: pointer; color: #888; font-size: 0.9rem;">
@@ -1064,21 +1031,7 @@ def generate_html(transactions: list[Transaction], output_path: str):
                 <tbody>
 """
 
-    for item in open_positions:
-        realized = item.get("realized_pnl", 0)
-        realized_class = "positive" if realized >= 0 else "negative"
-        realized_sign = "+" if realized >= 0 else ""
-        html += f"""                    <tr>
-                        <td class="isin">{item["isin"]}</td>
-                        <td class="name" title="{item["name"]}">{item["name"][:40]}</td>
-                        <td class="text-right mono">{format_german_number(item["open_stueck"])}</td>
-                        <td class="text-right mono">{format_german_number(item.get("avg_kauf_preis", 0))} €</td>
-                        <td class="text-right mono">{format_german_number(item.get("invested", 0))} €</td>
-                        <td class="text-right mono {realized_class}">{realized_sign}{format_german_number(realized)} €</td>
-                    </tr>
-"""
-
-    html += """                </tbody>
+_HTML_CLOSED_POSITIONS = """                </tbody>
             </table>
         </div>
 
@@ -1099,21 +1052,7 @@ def generate_html(transactions: list[Transaction], output_path: str):
                 <tbody>
 """
 
-    for item in closed_positions:
-        pnl_class = "positive" if item["pnl"] >= 0 else "negative"
-        pnl_sign = "+" if item["pnl"] >= 0 else ""
-        html += f"""                    <tr>
-                        <td class="isin">{item["isin"]}</td>
-                        <td class="name" title="{item["name"]}">{item["name"][:40]}</td>
-                        <td class="text-right mono">{item["kauf_count"]}</td>
-                        <td class="text-right mono">{item["verkauf_count"]}</td>
-                        <td class="text-right mono negative">{format_german_number(item["kauf_sum"])} €</td>
-                        <td class="text-right mono positive">+{format_german_number(item["verkauf_sum"])} €</td>
-                        <td class="text-right mono {pnl_class}">{pnl_sign}{format_german_number(item["pnl"])} €</td>
-                    </tr>
-"""
-
-    html += """                </tbody>
+_HTML_ALL_TRADES = """                </tbody>
             </table>
         </div>
 
@@ -1134,22 +1073,7 @@ def generate_html(transactions: list[Transaction], output_path: str):
                     <tbody>
 """
 
-    for t in sorted(trades, key=lambda x: x.datum, reverse=True):
-        typ_badge = "badge-kauf" if t.is_kauf else "badge-verkauf"
-        typ_text = "Kauf" if t.is_kauf else "Verkauf"
-        betrag_class = "negative" if t.betrag < 0 else "positive"
-        betrag_sign = "" if t.betrag < 0 else "+"
-        html += f"""                        <tr>
-                            <td class="mono">{t.datum.strftime('%d.%m.%Y')}</td>
-                            <td><span class="badge {typ_badge}">{typ_text}</span></td>
-                            <td class="isin">{t.isin}</td>
-                            <td class="name" title="{t.name}">{t.name[:35]}</td>
-                            <td class="text-right mono">{format_german_number(t.stueck)}</td>
-                            <td class="text-right mono {betrag_class}">{betrag_sign}{format_german_number(t.betrag)} €</td>
-                        </tr>
-"""
-
-    html += """                    </tbody>
+_HTML_CHARTS = """                    </tbody>
                 </table>
             </div>
         </div>
@@ -1180,9 +1104,18 @@ def generate_html(transactions: list[Transaction], output_path: str):
         </div>
     </div>
 
+"""
+
+_HTML_CHART_DATA = """    <script type="application/json" id="report-data">{report_data}</script>
     <script>
-        // Table sorting functionality
-        document.querySelectorAll('th.sortable').forEach(th => {
+        // Chart and table data, parsed once from the JSON block above
+        const {{ volumeMonthData, volumeWeekdayData, pnlTimeline, scatterData, tradesData }} =
+            JSON.parse(document.getElementById('report-data').textContent);
+"""
+
+_HTML_TAIL = """
+        // Table sorting functionality (the all-trades table sorts its own data, see below)
+        document.querySelectorAll('table:not(#all-trades-table) th.sortable').forEach(th => {
             th.addEventListener('click', () => {
                 const table = th.closest('table');
                 const tbody = table.querySelector('tbody');
@@ -1203,153 +1136,28 @@ def generate_html(transactions: list[Transaction], output_path: str):
                 const direction = isAsc ? -1 : 1;
 
                 rows.sort((a, b) => {
-                    let aVal = a.cells[colIndex].textContent.trim();
-                    let bVal = b.cells[colIndex].textContent.trim();
-
                     if (sortType === 'number') {
-                        // Parse numbers (handle German format and currency)
-                        aVal = parseFloat(aVal.replace(/[^\\d,.-]/g, '').replace('.', '').replace(',', '.')) || 0;
-                        bVal = parseFloat(bVal.replace(/[^\\d,.-]/g, '').replace('.', '').replace(',', '.')) || 0;
-                        return (aVal - bVal) * direction;
-                    } else if (sortType === 'date') {
-                        // Parse German date format DD.MM.YYYY
-                        const aParts = aVal.split('.');
-                        const bParts = bVal.split('.');
-                        aVal = new Date(aParts[2], aParts[1] - 1, aParts[0]);
-                        bVal = new Date(bParts[2], bParts[1] - 1, bParts[0]);
-                        return (aVal - bVal) * direction;
-                    } else {
-                        return aVal.localeCompare(bVal, 'de') * direction;
+                        // Numeric cells carry their raw value in data-sort-value
+                        return (a.cells[colIndex].dataset.sortValue - b.cells[colIndex].dataset.sortValue) * direction;
                     }
+
+                    const aVal = a.cells[colIndex].textContent.trim();
+                    const bVal = b.cells[colIndex].textContent.trim();
+                    return aVal.localeCompare(bVal, 'de') * direction;
                 });
 
                 rows.forEach(row => tbody.appendChild(row));
             });
         });
-"""
-
-    # Generate P&L over time data - calculate from individual sales using average cost basis
-    pnl_events = []
-
-    # Build cost basis per ISIN and calculate P&L for each sale
-    cost_basis_by_isin = {}  # ISIN -> {"total_cost": float, "total_stueck": float}
-
-    # Collect all trade transactions and sort by date
-    all_trade_transactions = sorted(trades, key=lambda t: t.datum)
-
-    for t in all_trade_transactions:
-        if not t.isin:
-            continue
-
-        if t.isin not in cost_basis_by_isin:
-            cost_basis_by_isin[t.isin] = {"total_cost": 0.0, "total_stueck": 0.0, "name": t.name}
 
-        basis = cost_basis_by_isin[t.isin]
-
-        if t.is_kauf:
-            # Add to cost basis (betrag is negative for purchases)
-            basis["total_cost"] += abs(t.betrag)
-            basis["total_stueck"] += t.stueck
-        elif t.is_verkauf and t.stueck > 0:
-            # Calculate realized P&L for this sale
-            if basis["total_stueck"] > 0:
-                avg_cost_per_unit = basis["total_cost"] / basis["total_stueck"]
-                cost_of_sold = avg_cost_per_unit * t.stueck
-                realized_pnl = t.betrag - cost_of_sold  # betrag is positive for sales
-
-                pnl_events.append({
-                    "date": t.datum,
-                    "pnl": realized_pnl,
-                    "type": "Trade",
-                    "name": basis["name"][:30]
-                })
-
-                # Reduce cost basis
-                basis["total_cost"] -= cost_of_sold
-                basis["total_stueck"] -= t.stueck
-
-    # Add dividends
-    for t in dividenden:
-        pnl_events.append({
-            "date": t.datum,
-            "pnl": t.betrag,
-            "type": "Dividende",
-            "name": t.isin or "Dividende"
-        })
-
-    # Add steuerausgleich
-    for t in steuerausgleich:
-        pnl_events.append({
-            "date": t.datum,
-            "pnl": t.betrag,
-            "type": "Steuerausgleich",
-            "name": "Steuerausgleich"
-        })
-
-    # Sort by date and calculate cumulative P&L
-    pnl_events.sort(key=lambda x: x["date"])
-    cumulative_pnl = 0
-    pnl_timeline = []
-    for event in pnl_events:
-        cumulative_pnl += event["pnl"]
-        pnl_timeline.append({
-            "date": event["date"].strftime("%Y-%m-%d"),
-            "cumulative": round(cumulative_pnl, 2),
-            "change": round(event["pnl"], 2),
-            "type": event["type"],
-            "name": event["name"]
-        })
-        # Aggregate P&L by month
-        month_key = event["date"].strftime("%Y-%m")
-        pnl_by_month[month_key] += event["pnl"]
-
-    # Generate scatter plot data for closed positions
-    scatter_data_pct = []
-    scatter_data_euro = []
-    for pos in closed_positions:
-        hold_days = pos.get("hold_days", 0)
-        rendite_pct = pos.get("rendite_pct", 0)
-        pnl_euro = pos.get("pnl", 0)
-        name = pos.get("name", "")[:25]
-        scatter_data_pct.append({
-            "x": hold_days,
-            "y": round(rendite_pct, 2),
-            "name": name,
-            "pnl": round(pnl_euro, 2)
-        })
-        scatter_data_euro.append({
-            "x": hold_days,
-            "y": round(pnl_euro, 2),
-            "name": name,
-            "pct": round(rendite_pct, 2)
-        })
-
-    # Generate volume chart data
-    sorted_months = sorted(volume_by_month.keys())
-    volume_month_data = {
-        "labels": sorted_months,
-        "kauf": [round(volume_by_month[m]["kauf"], 2) for m in sorted_months],
-        "verkauf": [round(volume_by_month[m]["verkauf"], 2) for m in sorted_months],
-        "count": [volume_by_month[m]["count"] for m in sorted_months],
-        "pnl": [round(pnl_by_month[m], 2) for m in sorted_months]
-    }
-
-    volume_weekday_data = {
-        "labels": weekday_names,
-        "kauf": [round(volume_by_weekday[i]["kauf"], 2) for i in range(7)],
-        "verkauf": [round(volume_by_weekday[i]["verkauf"], 2) for i in range(7)],
-        "count": [volume_by_weekday[i]["count"] for i in range(7)]
-    }
-
-    html += f"""
-        // Volume Charts
-        const volumeMonthData = {json.dumps(volume_month_data)};
-        const volumeWeekdayData = {json.dumps(volume_weekday_data)};
+        // German formatters shared by all chart labels and tooltips
+        const numberFormat = new Intl.NumberFormat('de-DE');
+        const dateFormat = new Intl.DateTimeFormat('de-DE');
 
         // Plugin to draw P&L under x-axis labels
-        const pnlLabelPlugin = {{
+        const pnlLabelPlugin = {
             id: 'pnlLabels',
-            afterDraw: function(chart) {{
+            afterDraw: function(chart) {
                 const ctx = chart.ctx;
                 const xAxis = chart.scales.x;
                 const yAxis = chart.scales.y;
@@ -1358,378 +1166,891 @@ def generate_html(transactions: list[Transaction], output_path: str):
                 ctx.font = '10px -apple-system, BlinkMacSystemFont, sans-serif';
                 ctx.textAlign = 'center';
 
-                volumeMonthData.pnl.forEach((pnl, i) => {{
+                volumeMonthData.pnl.forEach((pnl, i) => {
                     const x = xAxis.getPixelForValue(i);
                     const y = yAxis.bottom + 32;
 
                     ctx.fillStyle = pnl >= 0 ? '#10b981' : '#ef4444';
                     const sign = pnl >= 0 ? '+' : '';
-                    ctx.fillText(sign + pnl.toLocaleString('de-DE') + '€', x, y);
-                }});
+                    ctx.fillText(sign + numberFormat.format(pnl) + '€', x, y);
+                });
 
                 ctx.restore();
-            }}
-        }};
+            }
+        };
 
         // Volume per Month Chart
         const volumeMonthCtx = document.getElementById('volumeMonthChart').getContext('2d');
-        const volumeMonthChart = new Chart(volumeMonthCtx, {{
+        const volumeMonthChart = new Chart(volumeMonthCtx, {
             type: 'bar',
             plugins: [pnlLabelPlugin],
-            data: {{
-                labels: volumeMonthData.labels.map(m => {{
-                    const [year, month] = m.split('-');
-                    const date = new Date(year, month - 1);
-                    return date.toLocaleDateString('de-DE', {{ month: 'short', year: '2-digit' }});
-                }}),
+            data: {
+                labels: volumeMonthData.labels,
                 datasets: [
-                    {{
+                    {
                         label: 'Käufe',
                         data: volumeMonthData.kauf,
                         backgroundColor: 'rgba(239, 68, 68, 0.7)',
                         borderColor: '#ef4444',
                         borderWidth: 1
-                    }},
-                    {{
+                    },
+                    {
                         label: 'Verkäufe',
                         data: volumeMonthData.verkauf,
                         backgroundColor: 'rgba(16, 185, 129, 0.7)',
                         borderColor: '#10b981',
                         borderWidth: 1
-                    }}
+                    }
                 ]
-            }},
-            options: {{
+            },
+            options: {
                 responsive: true,
                 maintainAspectRatio: false,
-                layout: {{
-                    padding: {{ bottom: 20 }}
-                }},
-                plugins: {{
-                    legend: {{
+                // Data is index-aligned with the labels, so Chart.js can skip its checks
+                normalized: true,
+                layout: {
+                    padding: { bottom: 20 }
+                },
+                plugins: {
+                    legend: {
                         display: true,
-                        labels: {{ color: '#888' }}
-                    }},
-                    tooltip: {{
-                        callbacks: {{
-                            afterBody: function(context) {{
+                        labels: { color: '#888' }
+                    },
+                    tooltip: {
+                        callbacks: {
+                            afterBody: function(context) {
                                 const idx = context[0].dataIndex;
-                                return ['Trades: ' + volumeMonthData.count[idx], 'P&L: ' + (volumeMonthData.pnl[idx] >= 0 ? '+' : '') + volumeMonthData.pnl[idx].toLocaleString('de-DE') + ' €'];
-                            }}
-                        }}
-                    }}
-                }},
-                scales: {{
-                    x: {{
+                                return ['Trades: ' + volumeMonthData.count[idx], 'P&L: ' + (volumeMonthData.pnl[idx] >= 0 ? '+' : '') + numberFormat.format(volumeMonthData.pnl[idx]) + ' €'];
+                            }
+                        }
+                    }
+                },
+                scales: {
+                    x: {
                         stacked: false,
-                        ticks: {{ color: '#666' }},
-                        grid: {{ color: 'rgba(255,255,255,0.05)' }}
-                    }},
-                    y: {{
+                        ticks: { color: '#666' },
+                        grid: { color: 'rgba(255,255,255,0.05)' }
+                    },
+                    y: {
                         stacked: false,
-                        ticks: {{
+                        ticks: {
                             color: '#666',
-                            callback: function(value) {{ return value.toLocaleString('de-DE') + ' €'; }}
-                        }},
-                        grid: {{ color: 'rgba(255,255,255,0.05)' }}
-                    }}
-                }}
-            }}
-        }});
+                            callback: function(value) { return numberFormat.format(value) + ' €'; }
+                        },
+                        grid: { color: 'rgba(255,255,255,0.05)' }
+                    }
+                }
+            }
+        });
 
         // Volume per Weekday Chart
         const volumeWeekdayCtx = document.getElementById('volumeWeekdayChart').getContext('2d');
-        const volumeWeekdayChart = new Chart(volumeWeekdayCtx, {{
+        const volumeWeekdayChart = new Chart(volumeWeekdayCtx, {
             type: 'bar',
-            data: {{
+            data: {
                 labels: volumeWeekdayData.labels,
                 datasets: [
-                    {{
+                    {
                         label: 'Käufe',
                         data: volumeWeekdayData.kauf,
                         backgroundColor: 'rgba(239, 68, 68, 0.7)',
                         borderColor: '#ef4444',
                         borderWidth: 1
-                    }},
-                    {{
+                    },
+                    {
                         label: 'Verkäufe',
                         data: volumeWeekdayData.verkauf,
                         backgroundColor: 'rgba(16, 185, 129, 0.7)',
                         borderColor: '#10b981',
                         borderWidth: 1
-                    }}
+                    }
                 ]
-            }},
-            options: {{
+            },
+            options: {
                 responsive: true,
                 maintainAspectRatio: false,
-                plugins: {{
-                    legend: {{
+                normalized: true,
+                plugins: {
+                    legend: {
                         display: true,
-                        labels: {{ color: '#888' }}
-                    }},
-                    tooltip: {{
-                        callbacks: {{
-                            afterBody: function(context) {{
+                        labels: { color: '#888' }
+                    },
+                    tooltip: {
+                        callbacks: {
+                            afterBody: function(context) {
                                 const idx = context[0].dataIndex;
                                 return 'Trades: ' + volumeWeekdayData.count[idx];
-                            }}
-                        }}
-                    }}
-                }},
-                scales: {{
-                    x: {{
+                            }
+                        }
+                    }
+                },
+                scales: {
+                    x: {
                         stacked: false,
-                        ticks: {{ color: '#666' }},
-                        grid: {{ color: 'rgba(255,255,255,0.05)' }}
-                    }},
-                    y: {{
+                        ticks: { color: '#666' },
+                        grid: { color: 'rgba(255,255,255,0.05)' }
+                    },
+                    y: {
                         stacked: false,
-                        ticks: {{
+                        ticks: {
                             color: '#666',
-                            callback: function(value) {{ return value.toLocaleString('de-DE') + ' €'; }}
-                        }},
-                        grid: {{ color: 'rgba(255,255,255,0.05)' }}
-                    }}
-                }}
-            }}
-        }});
+                            callback: function(value) { return numberFormat.format(value) + ' €'; }
+                        },
+                        grid: { color: 'rgba(255,255,255,0.05)' }
+                    }
+                }
+            }
+        });
 
         // Log scale toggle
-        document.getElementById('logScaleToggle').addEventListener('change', function() {{
+        document.getElementById('logScaleToggle').addEventListener('change', function() {
             const isLog = this.checked;
             const scaleType = isLog ? 'logarithmic' : 'linear';
 
             volumeMonthChart.options.scales.y.type = scaleType;
             volumeWeekdayChart.options.scales.y.type = scaleType;
 
-            if (isLog) {{
+            if (isLog) {
                 volumeMonthChart.options.scales.y.min = 1;
                 volumeWeekdayChart.options.scales.y.min = 1;
                 // Log-friendly ticks
-                volumeMonthChart.options.scales.y.ticks = {{
+                volumeMonthChart.options.scales.y.ticks = {
                     color: '#666',
-                    callback: function(value) {{
-                        if (value === 1 || value === 10 || value === 100 || value === 1000 || value === 10000 || value === 100000) {{
-                            return value.toLocaleString('de-DE') + ' €';
-                        }}
+                    callback: function(value) {
+                        if (value === 1 || value === 10 || value === 100 || value === 1000 || value === 10000 || value === 100000) {
+                            return numberFormat.format(value) + ' €';
+                        }
                         return '';
-                    }}
-                }};
-                volumeWeekdayChart.options.scales.y.ticks = {{
+                    }
+                };
+                volumeWeekdayChart.options.scales.y.ticks = {
                     color: '#666',
-                    callback: function(value) {{
-                        if (value === 1 || value === 10 || value === 100 || value === 1000 || value === 10000 || value === 100000) {{
-                            return value.toLocaleString('de-DE') + ' €';
-                        }}
+                    callback: function(value) {
+                        if (value === 1 || value === 10 || value === 100 || value === 1000 || value === 10000 || value === 100000) {
+                            return numberFormat.format(value) + ' €';
+                        }
                         return '';
-                    }}
-                }};
-            }} else {{
+                    }
+                };
+            } else {
                 delete volumeMonthChart.options.scales.y.min;
                 delete volumeWeekdayChart.options.scales.y.min;
                 // Linear ticks
-                volumeMonthChart.options.scales.y.ticks = {{
+                volumeMonthChart.options.scales.y.ticks = {
                     color: '#666',
-                    callback: function(value) {{ return value.toLocaleString('de-DE') + ' €'; }}
-                }};
-                volumeWeekdayChart.options.scales.y.ticks = {{
+                    callback: function(value) { return numberFormat.format(value) + ' €'; }
+                };
+                volumeWeekdayChart.options.scales.y.ticks = {
                     color: '#666',
-                    callback: function(value) {{ return value.toLocaleString('de-DE') + ' €'; }}
-                }};
-            }}
+                    callback: function(value) { return numberFormat.format(value) + ' €'; }
+                };
+            }
 
             volumeMonthChart.update();
             volumeWeekdayChart.update();
-        }});
+        });
 
         // P&L Over Time Chart
-        const pnlTimeline = {json.dumps(pnl_timeline)};
-
+        const pnlPointColors = pnlTimeline.change.map(c => c >= 0 ? '#10b981' : '#ef4444');
+        const pnlDatasets = [{
+            label: 'Kumulierte P&L',
+            data: pnlTimeline.cumulative,
+            borderColor: '#00d4ff',
+            backgroundColor: 'rgba(0, 212, 255, 0.1)',
+            borderWidth: 3,
+            fill: true,
+            tension: 0.1,
+            pointRadius: 6,
+            pointHoverRadius: 10,
+            pointBackgroundColor: pnlPointColors,
+            pointBorderColor: pnlPointColors,
+            pointBorderWidth: 2
+        }];
+        // Long timelines draw only the line; the five largest gains and losses
+        // keep a marker in a separate dataset
+        if (pnlTimeline.change.length > 200) {
+            const change = pnlTimeline.change;
+            const order = change.map((c, i) => i).sort((a, b) => change[a] - change[b]);
+            const extremes = new Set(order.slice(0, 5).filter(i => change[i] < 0)
+                .concat(order.slice(-5).filter(i => change[i] > 0)));
+            pnlDatasets[0].pointRadius = 0;
+            pnlDatasets.push({
+                label: 'Größte Änderungen',
+                data: pnlTimeline.cumulative.map((v, i) => extremes.has(i) ? v : null),
+                showLine: false,
+                pointRadius: 6,
+                pointHoverRadius: 10,
+                pointBackgroundColor: pnlPointColors,
+                pointBorderColor: pnlPointColors,
+                pointBorderWidth: 2
+            });
+        }
         const pnlCtx = document.getElementById('pnlOverTimeChart').getContext('2d');
-        new Chart(pnlCtx, {{
+        new Chart(pnlCtx, {
             type: 'line',
-            data: {{
-                labels: pnlTimeline.map(d => d.date),
-                datasets: [{{
-                    label: 'Kumulierte P&L',
-                    data: pnlTimeline.map(d => d.cumulative),
-                    borderColor: '#00d4ff',
-                    backgroundColor: 'rgba(0, 212, 255, 0.1)',
-                    borderWidth: 3,
-                    fill: true,
-                    tension: 0.1,
-                    pointRadius: 6,
-                    pointHoverRadius: 10,
-                    pointBackgroundColor: pnlTimeline.map(d => d.change >= 0 ? '#10b981' : '#ef4444'),
-                    pointBorderColor: pnlTimeline.map(d => d.change >= 0 ? '#10b981' : '#ef4444'),
-                    pointBorderWidth: 2
-                }}]
-            }},
-            options: {{
+            data: {
+                labels: pnlTimeline.date,
+                datasets: pnlDatasets
+            },
+            options: {
                 responsive: true,
                 maintainAspectRatio: false,
-                interaction: {{
+                normalized: true,
+                interaction: {
                     intersect: false,
                     mode: 'index'
-                }},
-                plugins: {{
-                    legend: {{ display: false }},
-                    tooltip: {{
-                        callbacks: {{
-                            title: function(context) {{
+                },
+                plugins: {
+                    legend: { display: false },
+                    tooltip: {
+                        // The marker dataset repeats line points; describe each event once
+                        filter: item => item.datasetIndex === 0,
+                        callbacks: {
+                            title: function(context) {
                                 const idx = context[0].dataIndex;
-                                const d = pnlTimeline[idx];
-                                const date = new Date(d.date);
-                                return date.toLocaleDateString('de-DE');
-                            }},
-                            label: function(context) {{
+                                return dateFormat.format(new Date(pnlTimeline.date[idx]));
+                            },
+                            label: function(context) {
                                 const idx = context.dataIndex;
-                                const d = pnlTimeline[idx];
+                                const change = pnlTimeline.change[idx];
+                                const cumulative = pnlTimeline.cumulative[idx];
                                 return [
-                                    d.type + ': ' + d.name,
-                                    'Änderung: ' + (d.change >= 0 ? '+' : '') + d.change.toLocaleString('de-DE') + ' €',
-                                    'Kumuliert: ' + (d.cumulative >= 0 ? '+' : '') + d.cumulative.toLocaleString('de-DE') + ' €'
+                                    pnlTimeline.type[idx] + ': ' + pnlTimeline.name[idx],
+                                    'Änderung: ' + (change >= 0 ? '+' : '') + numberFormat.format(change) + ' €',
+                                    'Kumuliert: ' + (cumulative >= 0 ? '+' : '') + numberFormat.format(cumulative) + ' €'
                                 ];
-                            }}
-                        }}
-                    }}
-                }},
-                scales: {{
-                    x: {{
+                            }
+                        }
+                    }
+                },
+                scales: {
+                    x: {
                         type: 'category',
-                        title: {{ display: true, text: 'Datum', color: '#888' }},
-                        ticks: {{
+                        title: { display: true, text: 'Datum', color: '#888' },
+                        ticks: {
                             color: '#666',
                             maxRotation: 45,
                             minRotation: 45,
-                            callback: function(value, index) {{
-                                const date = new Date(pnlTimeline[index].date);
-                                return date.toLocaleDateString('de-DE', {{ month: 'short', year: '2-digit' }});
-                            }}
-                        }},
-                        grid: {{ color: 'rgba(255,255,255,0.05)' }}
-                    }},
-                    y: {{
-                        title: {{ display: true, text: 'Kumulierte P&L (€)', color: '#888' }},
-                        ticks: {{
+                            callback: function(value, index) {
+                                return pnlTimeline.tick[index];
+                            }
+                        },
+                        grid: { color: 'rgba(255,255,255,0.05)' }
+                    },
+                    y: {
+                        title: { display: true, text: 'Kumulierte P&L (€)', color: '#888' },
+                        ticks: {
                             color: '#666',
-                            callback: function(value) {{ return value.toLocaleString('de-DE') + ' €'; }}
-                        }},
-                        grid: {{ color: 'rgba(255,255,255,0.05)' }}
-                    }}
-                }}
-            }}
-        }});
-
-        // Chart.js configuration - Scatter plots
-        const scatterDataPct = {json.dumps(scatter_data_pct)};
-        const scatterDataEuro = {json.dumps(scatter_data_euro)};
+                            callback: function(value) { return numberFormat.format(value) + ' €'; }
+                        },
+                        grid: { color: 'rgba(255,255,255,0.05)' }
+                    }
+                }
+            }
+        });
+
+        // Chart.js configuration - Scatter plots. Both plot hold time against a
+        // return column and differ only in that column, its unit and the tooltip.
+        const scatterColors = ys => ys.map(y => y >= 0 ? 'rgba(16, 185, 129, 0.7)' : 'rgba(239, 68, 68, 0.7)');
+        const scatterBorders = ys => ys.map(y => y >= 0 ? '#10b981' : '#ef4444');
+        // Smaller points and no entry animation once the plots get crowded
+        const scatterDense = scatterData.hold_days.length > 500;
+        const pctLine = i => 'Rendite: ' + numberFormat.format(scatterData.pct[i]) + ' %';
+        const pnlLine = i => 'P&L: ' + numberFormat.format(scatterData.pnl[i]) + ' €';
+
+        function makeScatter(canvasId, ys, yTitle, unit, detailLines) {
+            return new Chart(document.getElementById(canvasId).getContext('2d'), {
+                type: 'scatter',
+                data: {
+                    datasets: [{
+                        label: 'Geschlossene Positionen',
+                        data: scatterData.hold_days.map((x, i) => ({ x: x, y: ys[i] })),
+                        backgroundColor: scatterColors(ys),
+                        borderColor: scatterBorders(ys),
+                        borderWidth: 2,
+                        pointRadius: scatterDense ? 3 : 8,
+                        pointHoverRadius: scatterDense ? 6 : 12
+                    }]
+                },
+                options: {
+                    responsive: true,
+                    maintainAspectRatio: false,
+                    animation: scatterDense ? false : undefined,
+                    plugins: {
+                        legend: { display: false },
+                        tooltip: {
+                            callbacks: {
+                                label: function(context) {
+                                    const i = context.dataIndex;
+                                    return [scatterData.name[i], 'Haltedauer: ' + scatterData.hold_days[i] + ' Tage'].concat(detailLines.map(line => line(i)));
+                                }
+                            }
+                        }
+                    },
+                    scales: {
+                        x: {
+                            title: { display: true, text: 'Haltedauer (Tage)', color: '#888' },
+                            ticks: { color: '#666' },
+                            grid: { color: 'rgba(255,255,255,0.05)' }
+                        },
+                        y: {
+                            title: { display: true, text: yTitle, color: '#888' },
+                            ticks: {
+                                color: '#666',
+                                callback: function(value) { return numberFormat.format(value) + ' ' + unit; }
+                            },
+                            grid: { color: 'rgba(255,255,255,0.05)' }
+                        }
+                    }
+                }
+            });
+        }
 
         // Hold time vs Rendite %
-        const pctCtx = document.getElementById('holdTimePctChart').getContext('2d');
-        new Chart(pctCtx, {{
-            type: 'scatter',
-            data: {{
-                datasets: [{{
-                    label: 'Geschlossene Positionen',
-                    data: scatterDataPct,
-                    backgroundColor: scatterDataPct.map(d => d.y >= 0 ? 'rgba(16, 185, 129, 0.7)' : 'rgba(239, 68, 68, 0.7)'),
-                    borderColor: scatterDataPct.map(d => d.y >= 0 ? '#10b981' : '#ef4444'),
-                    borderWidth: 2,
-                    pointRadius: 8,
-                    pointHoverRadius: 12
-                }}]
-            }},
-            options: {{
-                responsive: true,
-                maintainAspectRatio: false,
-                plugins: {{
-                    legend: {{ display: false }},
-                    tooltip: {{
-                        callbacks: {{
-                            label: function(context) {{
-                                const d = context.raw;
-                                return [d.name, 'Haltedauer: ' + d.x + ' Tage', 'Rendite: ' + d.y.toLocaleString('de-DE') + ' %', 'P&L: ' + d.pnl.toLocaleString('de-DE') + ' €'];
-                            }}
-                        }}
-                    }}
-                }},
-                scales: {{
-                    x: {{
-                        title: {{ display: true, text: 'Haltedauer (Tage)', color: '#888' }},
-                        ticks: {{ color: '#666' }},
-                        grid: {{ color: 'rgba(255,255,255,0.05)' }}
-                    }},
-                    y: {{
-                        title: {{ display: true, text: 'Rendite (%)', color: '#888' }},
-                        ticks: {{
-                            color: '#666',
-                            callback: function(value) {{ return value.toLocaleString('de-DE') + ' %'; }}
-                        }},
-                        grid: {{ color: 'rgba(255,255,255,0.05)' }}
-                    }}
-                }}
-            }}
-        }});
+        makeScatter('holdTimePctChart', scatterData.pct, 'Rendite (%)', '%', [pctLine, pnlLine]);
 
         // Hold time vs Rendite €
-        const euroCtx = document.getElementById('holdTimeEuroChart').getContext('2d');
-        new Chart(euroCtx, {{
-            type: 'scatter',
-            data: {{
-                datasets: [{{
-                    label: 'Geschlossene Positionen',
-                    data: scatterDataEuro,
-                    backgroundColor: scatterDataEuro.map(d => d.y >= 0 ? 'rgba(16, 185, 129, 0.7)' : 'rgba(239, 68, 68, 0.7)'),
-                    borderColor: scatterDataEuro.map(d => d.y >= 0 ? '#10b981' : '#ef4444'),
-                    borderWidth: 2,
-                    pointRadius: 8,
-                    pointHoverRadius: 12
-                }}]
-            }},
-            options: {{
-                responsive: true,
-                maintainAspectRatio: false,
-                plugins: {{
-                    legend: {{ display: false }},
-                    tooltip: {{
-                        callbacks: {{
-                            label: function(context) {{
-                                const d = context.raw;
-                                return [d.name, 'Haltedauer: ' + d.x + ' Tage', 'P&L: ' + d.y.toLocaleString('de-DE') + ' €', 'Rendite: ' + d.pct.toLocaleString('de-DE') + ' %'];
-                            }}
-                        }}
-                    }}
-                }},
-                scales: {{
-                    x: {{
-                        title: {{ display: true, text: 'Haltedauer (Tage)', color: '#888' }},
-                        ticks: {{ color: '#666' }},
-                        grid: {{ color: 'rgba(255,255,255,0.05)' }}
-                    }},
-                    y: {{
-                        title: {{ display: true, text: 'Rendite (€)', color: '#888' }},
-                        ticks: {{
-                            color: '#666',
-                            callback: function(value) {{ return value.toLocaleString('de-DE') + ' €'; }}
-                        }},
-                        grid: {{ color: 'rgba(255,255,255,0.05)' }}
-                    }}
-                }}
-            }}
-        }});
+        makeScatter('holdTimeEuroChart', scatterData.pnl, 'Rendite (€)', '€', [pnlLine, pctLine]);
+
+        // All trades table: rows are built from tradesData only for the visible
+        // part of the scroll area, with spacer rows standing in for the rest
+        (function() {
+            const container = document.querySelector('.trades-table');
+            const table = document.getElementById('all-trades-table');
+            const tbody = table.querySelector('tbody');
+            const headers = Array.from(table.querySelectorAll('th.sortable'));
+            const count = tradesData.date.length;
+            const overscan = 10;
+            const order = Array.from({ length: count }, (_, i) => i);
+            let rowHeight = 0;
+
+            // Sort key per column. Dates compare as YYYYMMDD, so trades of the same day
+            // keep their current order, as the stable sort did on the rendered rows.
+            const dateKeys = tradesData.date.map(d => +(d.slice(6) + d.slice(3, 5) + d.slice(0, 2)));
+            const sortKeys = [
+                i => dateKeys[i],
+                i => tradesData.kauf[i] ? 'Kauf' : 'Verkauf',
+                i => tradesData.isin[i],
+                i => tradesData.name[i].slice(0, 35),
+                i => tradesData.stueck[i],
+                i => tradesData.betrag[i],
+            ];
+
+            function cell(className, text) {
+                const td = document.createElement('td');
+                td.className = className;
+                td.textContent = text;
+                return td;
+            }
+
+            function buildRow(i) {
+                const kauf = tradesData.kauf[i];
+                const badge = document.createElement('span');
+                badge.className = kauf ? 'badge badge-kauf' : 'badge badge-verkauf';
+                badge.textContent = kauf ? 'Kauf' : 'Verkauf';
+                const typCell = document.createElement('td');
+                typCell.appendChild(badge);
+                const nameCell = cell('name', tradesData.name[i].slice(0, 35));
+                nameCell.title = tradesData.name[i];
+                const tr = document.createElement('tr');
+                tr.append(
+                    cell('mono', tradesData.date[i]),
+                    typCell,
+                    cell('isin', tradesData.isin[i]),
+                    nameCell,
+                    cell('text-right mono', tradesData.stueck_text[i]),
+                    cell('text-right mono ' + (tradesData.betrag[i] < 0 ? 'negative' : 'positive'), tradesData.betrag_text[i])
+                );
+                return tr;
+            }
+
+            function spacer(height) {
+                const td = document.createElement('td');
+                td.colSpan = 6;
+                td.style.cssText = 'height: ' + height + 'px; padding: 0; border: 0;';
+                const tr = document.createElement('tr');
+                tr.appendChild(td);
+                return tr;
+            }
+
+            function render() {
+                if (count === 0) return;
+                if (!rowHeight) {
+                    // All rows share one height; measure a real row once
+                    tbody.replaceChildren(buildRow(order[0]));
+                    rowHeight = tbody.rows[0].offsetHeight || 49;
+                }
+                const scrolled = container.scrollTop - table.tHead.offsetHeight;
+                const start = Math.max(0, Math.floor(scrolled / rowHeight) - overscan);
+                const end = Math.min(count, start + Math.ceil(container.clientHeight / rowHeight) + 2 * overscan);
+                const rows = [];
+                if (start > 0) rows.push(spacer(start * rowHeight));
+                for (let k = start; k < end; k++) rows.push(buildRow(order[k]));
+                if (end < count) rows.push(spacer((count - end) * rowHeight));
+                tbody.replaceChildren(...rows);
+            }
+
+            headers.forEach((th, colIndex) => {
+                th.addEventListener('click', () => {
+                    // Toggle sort direction
+                    const isAsc = th.classList.contains('asc');
+                    headers.forEach(header => header.classList.remove('asc', 'desc'));
+                    th.classList.add(isAsc ? 'desc' : 'asc');
+                    const direction = isAsc ? -1 : 1;
+
+                    const key = sortKeys[colIndex];
+                    if (th.dataset.sort === 'string') {
+                        order.sort((a, b) => key(a).localeCompare(key(b), 'de') * direction);
+                    } else {
+                        order.sort((a, b) => (key(a) - key(b)) * direction);
+                    }
+                    render();
+                });
+            });
+
+            let renderPending = false;
+            container.addEventListener('scroll', () => {
+                if (renderPending) return;
+                renderPending = true;
+                requestAnimationFrame(() => {
+                    renderPending = false;
+                    render();
+                });
+            });
+
+            render();
+        })();
     </script>
 </body>
 </html>
 """
 
+
+# Month axis labels as the browser writes them for de-DE { month: 'short', year: '2-digit' }
+_MONTH_LABELS = ("Jan.", "Feb.", "März", "Apr.", "Mai", "Juni", "Juli", "Aug.", "Sept.", "Okt.", "Nov.", "Dez.")
+
+
+@lru_cache(maxsize=4096)
+def _month_label(month: int) -> str:
+    """Return the axis label for a year * 12 + month - 1 key, e.g. 'März 24'"""
+    return f"{_MONTH_LABELS[month % 12]} {month // 12 % 100:02d}"
+
+
+# Upper bound for points in the P&L line chart; Chart.js draw time grows with
+# the point count, and a few thousand points already exceed the canvas width
+_PNL_TIMELINE_MAX_POINTS = 2000
+
+
+def _min_max_indices(values: list[float], max_points: int) -> list[int]:
+    """Return the indices kept by min-max decimation of values to about max_points"""
+    count = len(values)
+    if count <= max_points:
+        return list(range(count))
+    # Each bucket keeps its lowest and highest point; the ends are always kept
+    bucket_size = -(-count // (max_points // 2))
+    kept = {0, count - 1}
+    for start in range(0, count, bucket_size):
+        bucket = range(start, min(start + bucket_size, count))
+        kept.add(min(bucket, key=values.__getitem__))
+        kept.add(max(bucket, key=values.__getitem__))
+    return sorted(kept)
+
+
+def compute_summary(transactions: list[Transaction]) -> Summary:
+    """Compute positions, P&L and totals for the console output and the report"""
+
+    # Calculate statistics - include Orders, Sparpläne, Bruchstücke, and WP-Abrechnungen.
+    # Classification, all totals and the trade volume buckets are done in a
+    # single pass over the transactions.
+    trade_types = {"Order", "Sparplan", "Bruchstücke", "WP-Abrechnung"}
+    trades = []
+    steuerausgleich = []
+    dividenden = []
+
+    total_einzahlung = 0.0
+    total_auszahlung = 0.0
+    total_steuerausgleich = 0.0
+    total_dividenden = 0.0
+    total_volume = 0.0
+    kauf_count = 0
+    verkauf_count = 0
+
+    # Volume per month and per weekday (0=Monday, 6=Sunday).
+    # Buckets are [kauf, verkauf, count]; months are keyed by year * 12 + month - 1
+    # and only turned into month labels when the chart data is built.
+    volume_by_month = defaultdict(lambda: [0.0, 0.0, 0])
+    volume_by_weekday = [[0.0, 0.0, 0] for _ in range(7)]
+
+    for t in transactions:
+        typ = t.typ
+        if typ in trade_types:
+            trades.append(t)
+            amount = abs(t.betrag)
+            total_volume += amount
+            datum = t.datum
+            side = 0 if t.is_kauf else 1
+            if t.is_kauf:
+                kauf_count += 1
+            elif t.is_verkauf:
+                verkauf_count += 1
+            bucket = volume_by_month[datum.year * 12 + datum.month - 1]
+            bucket[side] += amount
+            bucket[2] += 1
+            bucket = volume_by_weekday[datum.weekday()]
+            bucket[side] += amount
+            bucket[2] += 1
+        elif typ == "Einzahlung":
+            total_einzahlung += t.betrag
+        elif typ == "Auszahlung":
+            total_auszahlung += t.betrag
+        elif typ == "Steuerausgleich":
+            steuerausgleich.append(t)
+            total_steuerausgleich += t.betrag
+        elif typ == "Dividende":
+            dividenden.append(t)
+            total_dividenden += t.betrag
+
+    # Group trades by ISIN with quantity tracking (Orders + Sparpläne + Bruchstücke).
+    # Counts, sums and the first buy / last sell dates are accumulated while
+    # grouping, so no per-ISIN trade lists are kept.
+    trades_by_isin = {}
+    for t in trades:
+        if not t.isin:  # Skip transactions without ISIN
+            continue
+        data = trades_by_isin.get(t.isin)
+        if data is None:
+            # Escaped once per ISIN for the position tables
+            data = trades_by_isin[t.isin] = {
+                "name": t.name,
+                "name_html": escape(t.name),
+                "name_html_short": escape(t.name[:40]),
+                "kauf_count": 0,
+                "verkauf_count": 0,
+                "kauf_sum": 0.0,
+                "verkauf_sum": 0.0,
+                "kauf_stueck": 0.0,
+                "verkauf_stueck": 0.0,
+                "first_buy": None,
+                "last_sell": None,
+            }
+        if t.is_kauf:
+            data["kauf_count"] += 1
+            data["kauf_sum"] += t.betrag
+            data["kauf_stueck"] += t.stueck
+            if data["first_buy"] is None or t.datum < data["first_buy"]:
+                data["first_buy"] = t.datum
+        else:
+            data["verkauf_count"] += 1
+            data["verkauf_sum"] += t.betrag
+            data["verkauf_stueck"] += t.stueck
+            if data["last_sell"] is None or t.datum > data["last_sell"]:
+                data["last_sell"] = t.datum
+
+    # Calculate PnL per ISIN - separate open and closed positions
+    closed_positions = []
+    open_positions = []
+
+    for isin, data in trades_by_isin.items():
+        kauf_sum = data["kauf_sum"]
+        verkauf_sum = data["verkauf_sum"]
+        kauf_stueck = data["kauf_stueck"]
+        verkauf_stueck = data["verkauf_stueck"]
+
+        # Calculate remaining/open quantity
+        open_stueck = kauf_stueck - verkauf_stueck
+
+        position_data = {
+            "isin": isin,
+            "name": data["name"],
+            "name_html": data["name_html"],
+            "name_html_short": data["name_html_short"],
+            "kauf_count": data["kauf_count"],
+            "verkauf_count": data["verkauf_count"],
+            "kauf_sum": kauf_sum,
+            "verkauf_sum": verkauf_sum,
+            "kauf_stueck": kauf_stueck,
+            "verkauf_stueck": verkauf_stueck,
+            "open_stueck": open_stueck,
+        }
+
+        if abs(open_stueck) < 0.001:  # Fully closed position
+            position_data["pnl"] = verkauf_sum + kauf_sum
+            # Calculate hold time (first buy to last sell)
+            first_buy = data["first_buy"]
+            last_sell = data["last_sell"]
+            if first_buy is not None and last_sell is not None:
+                position_data["hold_days"] = (last_sell - first_buy).days
+                position_data["first_buy"] = first_buy
+                position_data["last_sell"] = last_sell
+            else:
+                position_data["hold_days"] = 0
+            # Calculate return %
+            invested = abs(kauf_sum)
+            position_data["rendite_pct"] = (position_data["pnl"] / invested * 100) if invested > 0 else 0
+            closed_positions.append(position_data)
+        else:
+            # Open position - calculate average buy price for held shares
+            if kauf_stueck > 0:
+                avg_kauf_preis = abs(kauf_sum) / kauf_stueck
+                position_data["avg_kauf_preis"] = avg_kauf_preis
+                position_data["invested"] = open_stueck * avg_kauf_preis
+            else:
+                position_data["avg_kauf_preis"] = 0
+                position_data["invested"] = 0
+
+            # If there were partial sales, calculate realized PnL
+            if verkauf_stueck > 0:
+                # Proportional cost basis for sold shares
+                cost_of_sold = (verkauf_stueck / kauf_stueck) * abs(kauf_sum) if kauf_stueck > 0 else 0
+                position_data["realized_pnl"] = verkauf_sum - cost_of_sold
+            else:
+                position_data["realized_pnl"] = 0
+
+            open_positions.append(position_data)
+
+    # Sort closed by PnL, open by invested amount
+    closed_positions.sort(key=itemgetter("pnl"), reverse=True)
+    open_positions.sort(key=itemgetter("invested"), reverse=True)
+
+    # Realized P&L per sale using average cost basis. One pass over the trades
+    # sorted by date gives both the total and the per-sale events for the chart.
+    sorted_trades = sorted(trades, key=attrgetter("datum"))
+    cost_basis_by_isin = {}  # ISIN -> [total_cost, total_stueck, chart label]
+    sale_events = []  # (date, pnl, type, name), already in date order
+    total_trade_pnl = 0.0
+
+    for t in sorted_trades:
+        isin = t.isin
+        if not isin:
+            continue
+
+        basis = cost_basis_by_isin.get(isin)
+        if basis is None:
+            basis = cost_basis_by_isin[isin] = [0.0, 0.0, t.name[:30]]
+
+        if t.is_kauf:
+            # Add to cost basis (betrag is negative for purchases)
+            basis[0] += abs(t.betrag)
+            basis[1] += t.stueck
+        elif t.is_verkauf and t.stueck > 0 and basis[1] > 0:
+            cost_of_sold = basis[0] / basis[1] * t.stueck
+            realized_pnl = t.betrag - cost_of_sold  # betrag is positive for sales
+            total_trade_pnl += realized_pnl
+
+            sale_events.append((t.datum, realized_pnl, "Trade", basis[2]))
+
+            # Reduce cost basis
+            basis[0] -= cost_of_sold
+            basis[1] -= t.stueck
+
+    total_realized_pnl = total_trade_pnl + total_steuerausgleich + total_dividenden
+    total_invested_open = sum(p.get("invested", 0) for p in open_positions)
+
+    return Summary(
+        sorted_trades=sorted_trades,
+        steuerausgleich=steuerausgleich,
+        dividenden=dividenden,
+        open_positions=open_positions,
+        closed_positions=closed_positions,
+        sale_events=sale_events,
+        volume_by_month=volume_by_month,
+        volume_by_weekday=volume_by_weekday,
+        kauf_count=kauf_count,
+        verkauf_count=verkauf_count,
+        total_einzahlung=total_einzahlung,
+        total_auszahlung=total_auszahlung,
+        total_steuerausgleich=total_steuerausgleich,
+        total_dividenden=total_dividenden,
+        total_volume=total_volume,
+        total_realized_pnl=total_realized_pnl,
+        total_invested_open=total_invested_open,
+    )
+
+
+def generate_html(summary: Summary, output_path: str):
+    """Generate HTML overview of trades"""
+    sorted_trades = summary.sorted_trades
+    open_positions = summary.open_positions
+    closed_positions = summary.closed_positions
+    total_realized_pnl = summary.total_realized_pnl
+    weekday_names = ["Mo", "Di", "Mi", "Do", "Fr", "Sa", "So"]
+
+    # P&L per month, keyed like summary.volume_by_month
+    pnl_by_month = defaultdict(float)
+
+    # Merge sales, dividends and tax adjustments by date and calculate cumulative P&L.
+    # On equal dates sales come first, then dividends, then tax adjustments.
+    pnl_events = heapq.merge(
+        summary.sale_events,
+        ((t.datum, t.betrag, "Dividende", t.isin or "Dividende")
+         for t in sorted(summary.dividenden, key=attrgetter("datum"))),
+        ((t.datum, t.betrag, "Steuerausgleich", "Steuerausgleich")
+         for t in sorted(summary.steuerausgleich, key=attrgetter("datum"))),
+        key=itemgetter(0),
+    )
+    # The timeline is columnar (one list per field) to keep the embedded JSON small
+    cumulative_pnl = 0
+    pnl_timeline = {"date": [], "tick": [], "cumulative": [], "change": [], "type": [], "name": []}
+    timeline_date = pnl_timeline["date"].append
+    timeline_tick = pnl_timeline["tick"].append
+    timeline_cumulative = pnl_timeline["cumulative"].append
+    timeline_change = pnl_timeline["change"].append
+    timeline_type = pnl_timeline["type"].append
+    timeline_name = pnl_timeline["name"].append
+    for date, pnl, typ, name in pnl_events:
+        cumulative_pnl += pnl
+        # Many events share a date; the key is cached per date
+        timeline_date(_day_key(date))
+        month = date.year * 12 + date.month - 1
+        timeline_tick(_month_label(month))
+        timeline_cumulative(round(cumulative_pnl, 2))
+        timeline_change(round(pnl, 2))
+        timeline_type(typ)
+        timeline_name(name)
+        # Aggregate P&L by month
+        pnl_by_month[month] += pnl
+
+    # Long histories are thinned out for the chart; monthly P&L above uses every event
+    kept = _min_max_indices(pnl_timeline["cumulative"], _PNL_TIMELINE_MAX_POINTS)
+    if len(kept) < len(pnl_timeline["cumulative"]):
+        pnl_timeline = {key: [column[i] for i in kept] for key, column in pnl_timeline.items()}
+
+    # Generate scatter plot data for closed positions. Both scatter charts plot
+    # the same positions, so they share one columnar payload.
+    scatter_data = {
+        "hold_days": [pos["hold_days"] for pos in closed_positions],
+        "pct": [round(pos["rendite_pct"], 2) for pos in closed_positions],
+        "pnl": [round(pos["pnl"], 2) for pos in closed_positions],
+        "name": [pos["name"][:25] for pos in closed_positions],
+    }
+
+    # The all-trades table is rendered in the page from columnar data, newest
+    # first. Display texts are formatted here so they match the other tables.
+    # A stable descending sort keeps file order within a day; the list is
+    # already ordered, so this is a near-linear pass.
+    newest_first = sorted(sorted_trades, key=attrgetter("datum"), reverse=True)
+    trades_data = {
+        "date": [_display_date(t.datum) for t in newest_first],
+        "kauf": [t.is_kauf for t in newest_first],
+        "isin": [t.isin for t in newest_first],
+        "name": [t.name for t in newest_first],
+        "stueck": [round(t.stueck, 4) for t in newest_first],
+        "stueck_text": [format_german_number(t.stueck) for t in newest_first],
+        "betrag": [round(t.betrag, 2) for t in newest_first],
+        "betrag_text": [f"{'' if t.betrag < 0 else '+'}{format_german_number(t.betrag)} €" for t in newest_first],
+    }
+
+    # Generate volume chart data
+    month_buckets = sorted(summary.volume_by_month.items())
+    month_labels = [_month_label(m) for m, _ in month_buckets]
+    volume_month_data = {
+        "labels": month_labels,
+        "kauf": [round(b[0], 2) for _, b in month_buckets],
+        "verkauf": [round(b[1], 2) for _, b in month_buckets],
+        "count": [b[2] for _, b in month_buckets],
+        "pnl": [round(pnl_by_month[m], 2) for m, _ in month_buckets]
+    }
+
+    volume_weekday_data = {
+        "labels": weekday_names,
+        "kauf": [round(b[0], 2) for b in summary.volume_by_weekday],
+        "verkauf": [round(b[1], 2) for b in summary.volume_by_weekday],
+        "count": [b[2] for b in summary.volume_by_weekday]
+    }
+
+    parts: list[str] = [
+        _HTML_HEAD,
+        _HTML_STATS.format_map({
+            "total_einzahlung": format_german_number(summary.total_einzahlung),
+            "total_auszahlung": format_german_number(summary.total_auszahlung),
+            "realized_pnl_class": "positive" if total_realized_pnl >= 0 else "negative",
+            "realized_pnl_sign": "+" if total_realized_pnl >= 0 else "",
+            "total_realized_pnl": format_german_number(total_realized_pnl),
+            "total_invested_open": format_german_number(summary.total_invested_open),
+            "total_steuerausgleich": format_german_number(summary.total_steuerausgleich),
+            "total_dividenden": format_german_number(summary.total_dividenden),
+            "total_volume": format_german_number(summary.total_volume),
+            "total_trades_count": len(sorted_trades),
+        }),
+        _HTML_OPEN_POSITIONS,
+    ]
+
+    for item in open_positions:
+        realized = item.get("realized_pnl", 0)
+        realized_class = "positive" if realized >= 0 else "negative"
+        realized_sign = "+" if realized >= 0 else ""
+        parts.append(f"""                    <tr>
+                        <td class="isin">{item["isin"]}</td>
+                        <td class="name" title="{item["name_html"]}">{item["name_html_short"]}</td>
+                        <td class="text-right mono" data-sort-value="{item["open_stueck"]:.4f}">{format_german_number(item["open_stueck"])}</td>
+                        <td class="text-right mono" data-sort-value="{item.get("avg_kauf_preis", 0):.2f}">{format_german_number(item.get("avg_kauf_preis", 0))} €</td>
+                        <td class="text-right mono" data-sort-value="{item.get("invested", 0):.2f}">{format_german_number(item.get("invested", 0))} €</td>
+                        <td class="text-right mono {realized_class}" data-sort-value="{realized:.2f}">{realized_sign}{format_german_number(realized)} €</td>
+                    </tr>
+""")
+
+    parts.append(_HTML_CLOSED_POSITIONS)
+
+    for item in closed_positions:
+        pnl_class = "positive" if item["pnl"] >= 0 else "negative"
+        pnl_sign = "+" if item["pnl"] >= 0 else ""
+        parts.append(f"""                    <tr>
+                        <td class="isin">{item["isin"]}</td>
+                        <td class="name" title="{item["name_html"]}">{item["name_html_short"]}</td>
+                        <td class="text-right mono" data-sort-value="{item["kauf_count"]}">{item["kauf_count"]}</td>
+                        <td class="text-right mono" data-sort-value="{item["verkauf_count"]}">{item["verkauf_count"]}</td>
+                        <td class="text-right mono negative" data-sort-value="{item["kauf_sum"]:.2f}">{format_german_number(item["kauf_sum"])} €</td>
+                        <td class="text-right mono positive" data-sort-value="{item["verkauf_sum"]:.2f}">+{format_german_number(item["verkauf_sum"])} €</td>
+                        <td class="text-right mono {pnl_class}" data-sort-value="{item["pnl"]:.2f}">{pnl_sign}{format_german_number(item["pnl"])} €</td>
+                    </tr>
+""")
+
+    parts.append(_HTML_ALL_TRADES)
+
+    parts.append(_HTML_CHARTS)
+    parts.append(_HTML_CHART_DATA.format_map({
+        "report_data": _json_encode({
+            "volumeMonthData": volume_month_data,
+            "volumeWeekdayData": volume_weekday_data,
+            "pnlTimeline": pnl_timeline,
+            "scatterData": scatter_data,
+            "tradesData": trades_data,
+        }),
+    }))
+    parts.append(_HTML_TAIL)
+
+    # Write the fragments directly instead of joining them into one more copy
     with open(output_path, "w", encoding="utf-8") as f:
-        f.write(html)
+        f.writelines(parts)
 
     print(f"HTML report generated: {output_path}")
 
 
+def _add_loaded(all_transactions: list[Transaction], load: Callable[[], list[Transaction]]) -> list[Transaction]:
+    """Add the transactions returned by load(), reporting their count or the error"""
+    try:
+        transactions = load()
+    except Exception as e:
+        print(f"  -> Error: {e}")
+        return []
+    print(f"  -> {len(transactions)} transactions")
+    all_transactions.extend(transactions)
+    return transactions
+
+
+def _pdf_executor(file_count: int) -> ProcessPoolExecutor | None:
+    """Return a process pool for parsing several PDFs, or None to parse them in-process"""
+    # A single file is read directly; worker start-up (a fresh interpreter that
+    # re-imports pdfplumber under spawn) would cost more than it saves
+    if file_count < 2:
+        return None
+    try:
+        return ProcessPoolExecutor(max_workers=min(file_count, os.cpu_count() or 1))
+    except (OSError, NotImplementedError):
+        # No working process support (restricted or sandboxed environments)
+        return None
+
+
 def load_transactions(directory: Path) -> list[Transaction]:
     """Load transactions from all available sources (CSV and PDF files)"""
     all_transactions = []
@@ -1738,25 +2059,33 @@ def load_transactions(directory: Path) -> list[Transaction]:
     csv_files = list(directory.glob("ZERO-*.csv"))
     for csv_file in csv_files:
         print(f"Loading CSV: {csv_file.name}...")
-        try:
-            transactions = read_csv(str(csv_file))
-            print(f"  -> {len(transactions)} transactions")
-            all_transactions.extend(transactions)
-        except Exception as e:
-            print(f"  -> Error: {e}")
+        _add_loaded(all_transactions, partial(read_csv, str(csv_file)))
 
     # Find and load Trade Republic PDF files
     if PDF_SUPPORT:
         pdf_files = list(directory.glob("*.pdf"))
-        # Filter for likely Trade Republic files (Kontoauszug, etc.)
-        for pdf_file in pdf_files:
-            print(f"Loading PDF: {pdf_file.name}...")
-            try:
-                transactions = read_trade_republic_pdf(str(pdf_file))
-                print(f"  -> {len(transactions)} transactions")
-                all_transactions.extend(transactions)
-            except Exception as e:
-                print(f"  -> Error: {e}")
+        executor = _pdf_executor(len(pdf_files))
+        if executor is None:
+            for pdf_file in pdf_files:
+                print(f"Loading PDF: {pdf_file.name}...")
+                _add_loaded(all_transactions, partial(read_trade_republic_pdf, str(pdf_file)))
+        else:
+            # pdfplumber parsing is CPU-bound, so the files are parsed in worker
+            # processes; results are still taken in file order
+            with executor:
+                loads = []
+                for pdf_file in pdf_files:
+                    print(f"Loading PDF: {pdf_file.name}...")
+                    load = partial(read_trade_republic_pdf, str(pdf_file))
+                    try:
+                        loads.append(executor.submit(load).result)
+                    except (OSError, NotImplementedError):
+                        # No worker could be started; parse this file in-process
+                        loads.append(load)
+                for load in loads:
+                    # Pool results are unpickled copies, so their ISINs are interned again
+                    for t in _add_loaded(all_transactions, load):
+                        t.isin = intern(t.isin)
 
     # Remove duplicates based on (datum, betrag, isin, stueck)
     seen = set()
@@ -1782,63 +2111,18 @@ def main():
 
     print(f"Total transactions: {len(transactions)}")
 
-    # Trade summary - include Orders, Sparpläne, Bruchstücke, and WP-Abrechnungen
-    trade_types = ["Order", "Sparplan", "Bruchstücke", "WP-Abrechnung"]
-    trades = [t for t in transactions if t.typ in trade_types]
-    kaufe = [t for t in trades if t.is_kauf]
-    verkaeufe = [t for t in trades if t.is_verkauf]
+    # Positions and P&L are computed once for both the console and the report
+    summary = compute_summary(transactions)
 
-    print(f"Trades: {len(trades)} ({len(kaufe)} Käufe, {len(verkaeufe)} Verkäufe)")
+    print(f"Trades: {len(summary.sorted_trades)} ({summary.kauf_count} Käufe, {summary.verkauf_count} Verkäufe)")
+    print(f"\nOffene Positionen: {len(summary.open_positions)}")
+    print(f"Geschlossene Positionen: {len(summary.closed_positions)}")
+    print(f"Steuerausgleich: {summary.total_steuerausgleich:,.2f} EUR")
+    print(f"Dividenden: {summary.total_dividenden:,.2f} EUR")
+    print(f"Realisierte P&L (inkl. Steuer+Div): {summary.total_realized_pnl:,.2f} EUR")
+    print(f"Noch investiert (offene Pos.): {summary.total_invested_open:,.2f} EUR")
 
-    # Calculate open/closed for console output
-    trades_by_isin = {}
-    for t in trades:
-        if not t.isin:
-            continue
-        if t.isin not in trades_by_isin:
-            trades_by_isin[t.isin] = {"kaufe": [], "verkaeufe": []}
-        if t.is_kauf:
-            trades_by_isin[t.isin]["kaufe"].append(t)
-        else:
-            trades_by_isin[t.isin]["verkaeufe"].append(t)
-
-    total_realized = 0.0
-    total_invested_open = 0.0
-    open_count = 0
-    closed_count = 0
-
-    for isin, data in trades_by_isin.items():
-        kauf_sum = sum(t.betrag for t in data["kaufe"])
-        verkauf_sum = sum(t.betrag for t in data["verkaeufe"])
-        kauf_stueck = sum(t.stueck for t in data["kaufe"])
-        verkauf_stueck = sum(t.stueck for t in data["verkaeufe"])
-        open_stueck = kauf_stueck - verkauf_stueck
-
-        if abs(open_stueck) < 0.001:  # Closed
-            total_realized += verkauf_sum + kauf_sum
-            closed_count += 1
-        else:  # Open
-            open_count += 1
-            if kauf_stueck > 0:
-                avg_price = abs(kauf_sum) / kauf_stueck
-                total_invested_open += open_stueck * avg_price
-                if verkauf_stueck > 0:
-                    cost_of_sold = (verkauf_stueck / kauf_stueck) * abs(kauf_sum)
-                    total_realized += verkauf_sum - cost_of_sold
-
-    # Add Steuerausgleich and Dividenden
-    steuerausgleich = sum(t.betrag for t in transactions if t.typ == "Steuerausgleich")
-    dividenden = sum(t.betrag for t in transactions if t.typ == "Dividende")
-    total_realized += steuerausgleich + dividenden
-
-    print(f"\nOffene Positionen: {open_count}")
-    print(f"Geschlossene Positionen: {closed_count}")
-    print(f"Steuerausgleich: {steuerausgleich:,.2f} EUR")
-    print(f"Dividenden: {dividenden:,.2f} EUR")
-    print(f"Realisierte P&L (inkl. Steuer+Div): {total_realized:,.2f} EUR")
-    print(f"Noch investiert (offene Pos.): {total_invested_open:,.2f} EUR")
-
-    generate_html(transactions, str(html_file))
+    generate_html(summary, str(html_file))
 
 
 if __name__ == "__main__":